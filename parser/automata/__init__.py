@@ -1,3 +1,12 @@
 from automata.af import AF
 from automata.afd import AFD
 from automata.afnd import AFND
+from automata.classes import AlphabetClasses
+from automata.frozen import FrozenAFD
+from automata.dense import DenseAFD
+from automata.packed import PackedAFD
+from automata.lazy import LazyAFD
+from automata.simulation import AFNDSimulation
+from automata.errors import BudgetExceeded, StateLimitExceeded
+from automata.budget import Budget
+from automata.bitparallel import BitParallelAFND
@@ -15,6 +15,10 @@ class AF(ABC):
         self.final_states = set()
         self.transitions = {}
         self.alphabet = set()
+        # Si no es None, el alfabeto son ids de clases de caracteres (AlphabetClasses)
+        self.classes = None
+        # Etiquetas de los estados finales (bitmask de ids de patrones, ver RegexSet)
+        self.tags = {}
 
     def size(self):
         """Devuelve la cantidad de estados del autómata."""
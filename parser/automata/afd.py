@@ -1,5 +1,6 @@
 from typing import Hashable
 from automata.af import AF
+from automata.budget import Budget
 
 __all__ = ["AFD"]
 
@@ -16,65 +17,149 @@ class AFD(AF):
         self.transitions[state1][char] = state2
         self.alphabet.add(char)
 
-    def minimize(self):
-        """Minimiza el autómata."""
-        P = [self.final_states, self.states.difference(self.final_states)]
-        W = [self.final_states, self.states.difference(self.final_states)]
-        
-        while (len(W) != 0 ) :
-            A = W.pop()
-            for c in self.alphabet:
-                X = set()
-                for state in self.states :
-                    posible = self.transitions[state][c]
-                    if (posible in A):
-                        X.add(state)
-                if (len(X) != 0) :         
-                    for Y in P:
-                        D = Y.difference(X)
-                        I = X.intersection(Y)
-
-                        if (((len(I) != 0) and len(D) != 0)):
-                            P.remove(Y)
-                            P.append(I)
-                            P.append(D)
-                        if (Y in W):
-                            W.remove(Y)
-                            W.append(I)
-                            W.append(D)
-                        elif (len(I) <= len(D)):
-                            W.append(I)
-                        else:
-                            W.append(D)
-
-        midicionario = {}
-        
-        i = 0
+    def is_complete(self) -> bool:
+        """Indica si todos los estados tienen una transición para cada símbolo del alfabeto."""
+        return all(len(self.transitions[state]) == len(self.alphabet) for state in self.states)
+
+    def completed(self, sink: Hashable = None) -> "AFD":
+        """
+        Devuelve una copia completa del autómata: las transiciones que faltan
+        van a un estado trampa explícito (que sólo se agrega si hace falta),
+        llamado `sink` si se indica un nombre.
+        """
+        res = AFD()
+        res.alphabet = set(self.alphabet)
+        res.classes = self.classes
+        res.tags = dict(self.tags)
+        for state in self.states:
+            res.add_state(state, state in self.final_states)
+        res.mark_initial_state(self.initial_state)
+        if sink is not None and sink in self.states:
+            raise ValueError(f"El estado {sink} ya pertenece al autómata.")
+        for state in self.states:
+            for char in self.alphabet:
+                if char in self.transitions[state]:
+                    res.add_transition(state, self.transitions[state][char], char)
+                else:
+                    if sink not in res.states:
+                        sink = object() if sink is None else sink
+                        res.add_state(sink)
+                        for c in self.alphabet:
+                            res.add_transition(sink, sink, c)
+                    res.add_transition(state, sink, char)
+        return res
+
+    def minimize(self, budget: Budget = None):
+        """
+        Minimiza el autómata con el algoritmo de Hopcroft, en tiempo
+        O(n·k·log n): usa las transiciones inversas para calcular la preimagen
+        de cada bloque separador y una partición refinable (`_Partition`) para
+        separar sólo los bloques afectados.
+
+        Funciona directamente sobre autómatas parciales (las transiciones que
+        faltan van a un estado trampa implícito), sin completarlos: los estados
+        desde los que no se llega a uno final se descartan antes de refinar y
+        todos los bloques iniciales empiezan como separadores (como en
+        Valmari-Lehtinen). El resultado es parcial si el autómata lo es; si el
+        autómata es completo, el resultado se completa con un único estado trampa.
+        Los estados finales con etiquetas (`tags`) distintas nunca se juntan.
+
+        Si se indica un presupuesto (`Budget`), antes de empezar se verifica
+        la memoria (las transiciones inversas ocupan tanto como el autómata)
+        y después el tiempo en cada separador.
+        """
+        complete = self.is_complete()
+        states = list(self.states)
+        index = {state: i for i, state in enumerate(states)}
+        alphabet = list(self.alphabet)
+        if budget is not None:
+            budget.check_dfa(len(states), sum(len(self.transitions[state]) for state in states))
+
+        # Transiciones inversas: inverse[c][j] son los estados que van a j con c
+        inverse = [{} for _ in alphabet]
+        for i, state in enumerate(states):
+            for c, char in enumerate(alphabet):
+                if char in self.transitions[state]:
+                    inverse[c].setdefault(index[self.transitions[state][char]], []).append(i)
+
+        # Estados vivos: desde los que se llega a un estado final. Los demás
+        # son equivalentes al estado trampa implícito.
+        vivos = [False] * len(states)
+        kola = [index[state] for state in self.final_states]
+        for j in kola:
+            vivos[j] = True
+        while len(kola) > 0:
+            j = kola.pop()
+            for c in range(len(alphabet)):
+                for i in inverse[c].get(j, ()):
+                    if not vivos[i]:
+                        vivos[i] = True
+                        kola.append(i)
 
         miautomatito = AFD()
+        miautomatito.alphabet = set(self.alphabet)
+        miautomatito.classes = self.classes
+        if not vivos[index[self.initial_state]]:
+            # El lenguaje es vacío: alcanza con el estado inicial
+            miautomatito.add_state(0)
+            miautomatito.mark_initial_state(0)
+            if complete:
+                for char in self.alphabet:
+                    miautomatito.add_transition(0, 0, char)
+            return miautomatito
 
-        for subconjunto in P:
-            if (len(subconjunto) != 0 ) :
-                for elemento in subconjunto:
-                  midicionario[elemento] = i
-                  if((elemento in self.final_states) and (i not in miautomatito.states)):
-                      miautomatito.add_state(i,True)
-                i = i+1 
-       
-        miautomatito.alphabet = self.alphabet
-        for k in range(0,i) :
-            if(k not in miautomatito.states):
-                miautomatito.add_state(k,False)
-        
-        for subconjunto in P: 
-            if (len(subconjunto) != 0): 
-                miestado = subconjunto.pop()
-                for c in miautomatito.alphabet :
-                    nuevoEstado = midicionario[miestado]
-                    estadoTransicion = midicionario[self.transitions[miestado][c]]
-                    miautomatito.add_transition(nuevoEstado,estadoTransicion,c)
-        miautomatito.mark_initial_state(midicionario[self.initial_state])
-    
+        # Los estados finales se separan de entrada según sus etiquetas
+        finales = {}
+        for i, state in enumerate(states):
+            if vivos[i] and state in self.final_states:
+                finales.setdefault(self.tags.get(state, 0), []).append(i)
+        partition = _Partition(len(states), *finales.values(),
+                               [i for i, state in enumerate(states) if vivos[i] and state not in self.final_states])
+        kola = list(range(partition.size()))
+        en_kola = [True] * partition.size()
+
+        while len(kola) > 0:
+            splitter = kola.pop()
+            en_kola[splitter] = False
+            if budget is not None:
+                budget.check()
+            A = partition.elements(splitter)
+            for c in range(len(alphabet)):
+                for j in A:
+                    for i in inverse[c].get(j, ()):
+                        partition.mark(i)
+                for block, new_block in partition.split():
+                    # Si el bloque ya estaba pendiente hay que agregar la parte
+                    # nueva; si no, alcanza con agregar la más chica de las dos
+                    en_kola.append(False)
+                    if en_kola[block] or partition.block_size(new_block) <= partition.block_size(block):
+                        agregar = new_block
+                    else:
+                        agregar = block
+                    en_kola[agregar] = True
+                    kola.append(agregar)
+
+        # El bloque del estado inicial pasa a ser el estado 0
+        initial_block = partition.block_of[index[self.initial_state]]
+        nombres = {initial_block: 0}
+        for block in range(partition.size()):
+            if block not in nombres:
+                nombres[block] = len(nombres)
+
+        for block in range(partition.size()):
+            representante = states[partition.elements(block)[0]]
+            miautomatito.add_state(nombres[block], representante in self.final_states)
+            if representante in self.tags:
+                miautomatito.tags[nombres[block]] = self.tags[representante]
+        for block in range(partition.size()):
+            representante = states[partition.elements(block)[0]]
+            for char, next_state in self.transitions[representante].items():
+                if vivos[index[next_state]]:
+                    miautomatito.add_transition(nombres[block], nombres[partition.block_of[index[next_state]]], char)
+        miautomatito.mark_initial_state(0)
+
+        if complete and not miautomatito.is_complete():
+            return miautomatito.completed(sink=miautomatito.size())
         return miautomatito
 
     def _rename_state_in_transitions(self, old_name: Hashable, new_name: Hashable):
@@ -103,13 +188,105 @@ class AFD(AF):
     def match_string(self, word):
         res = False
         estadoActual = self.initial_state
-        
+        transitions = self.transitions
+        if self.classes is not None:
+            class_of = self.classes.class_of
+            for letra in word:
+                siguientes = transitions[estadoActual]
+                letra = class_of[letra]
+                if letra not in siguientes:
+                    return False
+                estadoActual = siguientes[letra]
+            return estadoActual in self.final_states
+
         for letra in word:
-            if letra not in self.transitions[estadoActual]:
-                return False #xq caso trampa no tiene rulitos a si mismo
-            estadoActual = self.transitions[estadoActual][letra]
+            if letra not in transitions[estadoActual]:
+                return False #la transicion que falta va al estado trampa implicito
+            estadoActual = transitions[estadoActual][letra]
         
         if estadoActual in self.final_states:
             res = True
 
         return res
+
+
+class _Partition:
+    """
+    Partición refinable de los estados 0..n-1 (la estructura de Hopcroft).
+
+    Los elementos de cada bloque ocupan un rango contiguo de `elems`, y los
+    elementos marcados de un bloque se mueven al principio de su rango, así
+    marcar un estado y separar un bloque cuestan tiempo constante por estado.
+    """
+
+    def __init__(self, n: int, *blocks: list[int]):
+        """
+        Arma la partición con los bloques (no vacíos) dados. Los estados de
+        0..n-1 que no están en ningún bloque quedan fuera de la partición.
+        """
+        self.elems = []
+        self.first = []
+        self.past = []
+        self.marked = []
+        self.touched = []
+        self.block_of = [-1] * n
+        self.loc = [-1] * n
+        for block in blocks:
+            if len(block) > 0:
+                b = len(self.first)
+                self.first.append(len(self.elems))
+                for state in block:
+                    self.block_of[state] = b
+                    self.loc[state] = len(self.elems)
+                    self.elems.append(state)
+                self.past.append(len(self.elems))
+                self.marked.append(0)
+
+    def size(self) -> int:
+        """Devuelve la cantidad de bloques."""
+        return len(self.first)
+
+    def block_size(self, block: int) -> int:
+        """Devuelve la cantidad de estados de un bloque."""
+        return self.past[block] - self.first[block]
+
+    def elements(self, block: int) -> list[int]:
+        """Devuelve (una copia de) los estados de un bloque."""
+        return self.elems[self.first[block]:self.past[block]]
+
+    def mark(self, state: int):
+        """Marca un estado, moviéndolo a la parte marcada de su bloque."""
+        block = self.block_of[state]
+        m = self.first[block] + self.marked[block]
+        pos = self.loc[state]
+        if pos < m:
+            return
+        other = self.elems[m]
+        self.elems[m], self.elems[pos] = state, other
+        self.loc[state], self.loc[other] = m, pos
+        if self.marked[block] == 0:
+            self.touched.append(block)
+        self.marked[block] += 1
+
+    def split(self) -> list[tuple[int, int]]:
+        """
+        Separa la parte marcada de cada bloque tocado (si no es el bloque
+        entero) en un bloque nuevo, desmarca todo y devuelve los pares
+        (bloque, bloque nuevo).
+        """
+        res = []
+        for block in self.touched:
+            m = self.first[block] + self.marked[block]
+            self.marked[block] = 0
+            if m == self.past[block]:
+                continue
+            new_block = len(self.first)
+            self.first.append(self.first[block])
+            self.past.append(m)
+            self.marked.append(0)
+            self.first[block] = m
+            for pos in range(self.first[new_block], m):
+                self.block_of[self.elems[pos]] = new_block
+            res.append((block, new_block))
+        self.touched = []
+        return res
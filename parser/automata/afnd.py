@@ -3,6 +3,8 @@ from typing import Hashable, Union
 
 from automata.af import AF
 from automata.afd import AFD
+from automata.budget import Budget
+from automata.errors import StateLimitExceeded
 
 
 __all__ = ["AFND"]
@@ -15,6 +17,21 @@ class SpecialSymbol(Enum):
 class AFND(AF):
     """Autómata finito no determinístico (con transiciones lambda)."""
 
+    # Si no es None, `new_state` verifica sus límites (ver `RegEx.to_afnd`)
+    budget = None
+
+    def new_state(self, final: bool = False) -> int:
+        """
+        Agrega un estado nuevo y lo devuelve. Los estados se numeran con
+        enteros consecutivos según la cantidad de estados del autómata.
+        """
+        state = len(self.states)
+        if self.budget is not None:
+            # La construcción de Thompson agrega a lo sumo dos transiciones por estado
+            self.budget.check_nfa(state + 1, 2 * (state + 1))
+        self.add_state(state, final)
+        return state
+
     def add_transition(self, state1: Hashable, state2: Hashable, char: Union[str, SpecialSymbol]):
         """Agrega una transición al autómata."""
         if state1 not in self.states:
@@ -27,64 +44,157 @@ class AFND(AF):
         if char is not SpecialSymbol.Lambda:
             self.alphabet.add(char)
 
-# clasura se encarga de buscar todos los caminitos lambda que haya.
-# Para ello, se usa una cola, y se mantiene un historial para no volver a encolar los estados para los cuales ya vimos la clausura lambda 
-    def lambda_closure(self, p: set()) -> set():
-        resHist = p
-        res = list(p)
+    def reverse(self) -> "AFND":
+        """
+        Devuelve el autómata reverso, que acepta las cadenas del lenguaje dadas
+        vuelta: cada transición cambia de sentido, un estado inicial nuevo va
+        con transiciones lambda a los que eran finales, y el único estado final
+        es el que era inicial. Los estados se numeran 0..n-1 (en el orden de
+        `states`) y el inicial nuevo es n.
+        """
+        states = list(self.states)
+        index = {state: i for i, state in enumerate(states)}
+        res = AFND()
+        res.classes = self.classes
+        for state in states:
+            res.new_state(state == self.initial_state)
+        inicial = res.new_state()
+        res.mark_initial_state(inicial)
+        for state in self.final_states:
+            res.add_transition(inicial, index[state], SpecialSymbol.Lambda)
+        for state in states:
+            for char, next_states in self.transitions[state].items():
+                for next_state in next_states:
+                    res.add_transition(index[next_state], index[state], char)
+        res.alphabet = set(self.alphabet)
+        return res
+
+# clausura se encarga de buscar todos los caminitos lambda que haya.
+# Para ello, se usa una pila, y se mantiene un historial para no volver a apilar los estados para los cuales ya vimos la clausura lambda
+    def lambda_closure(self, p: set) -> set:
+        res = set(p)
         kola = list(p)
         while len(kola) > 0:
             state = kola.pop()
-            resHist.add(state)
-                    
-            if SpecialSymbol.Lambda in self.transitions[state]:
-                res = res + list(self.transitions[state][SpecialSymbol.Lambda])
-                kola = kola + list( self.transitions[state][SpecialSymbol.Lambda].difference(resHist) )                
-
-        return set(res)
-    
-    def determinize(self) -> AFD:
-        """Determiniza el autómata."""
-                     
-        def arreglar(algo: set()) -> set():
-            return ''.join(sorted(list(algo)))
-        
-        miInicial = self.lambda_closure(set([self.initial_state]))
-        nombre = arreglar(miInicial)
-
-        res = AFD()
-        res.alphabet = self.alphabet
-
-        if len(miInicial.intersection(self.final_states)) != 0:
-            res.add_state(nombre, True)
-        else:
-            res.add_state(nombre)
-        res.mark_initial_state(nombre)
+            for next_state in self.transitions[state].get(SpecialSymbol.Lambda, ()):
+                if next_state not in res:
+                    res.add(next_state)
+                    kola.append(next_state)
+        return res
 
+    def determinize(self, complete: bool = True, max_states: int = None, budget: Budget = None) -> AFD:
+        """
+        Determiniza el autómata (construcción de subconjuntos).
+
+        Con `complete=False` cada subconjunto sólo recorre los símbolos que
+        efectivamente salen de sus estados, y el subconjunto vacío no se
+        agrega: el AFD resultante es parcial y las transiciones que faltan van
+        a un estado trampa implícito.
+
+        Los estados del AFND se numeran 0..n-1 y cada subconjunto se representa
+        con un entero usado como bitset. La clausura lambda de cada estado se
+        calcula una sola vez, y también el conjunto (ya clausurado) al que se
+        llega desde cada estado con cada símbolo. Los estados del AFD resultante
+        son enteros consecutivos, con 0 como estado inicial. Si hay estados
+        etiquetados (`tags`), cada subconjunto lleva la unión de sus etiquetas.
+
+        Si se indica `max_states` y el AFD necesita más estados, se lanza
+        `StateLimitExceeded` apenas se pasa del límite. Si se indica un
+        presupuesto (`Budget`), se verifica cada vez que se agrega un estado.
+        """
+        states = list(self.states)
+        index = {state: i for i, state in enumerate(states)}
+        closures = self._closure_bitsets(states, index)
+
+        moves = []
+        for state in states:
+            move = {}
+            for char, next_states in self.transitions[state].items():
+                if char is not SpecialSymbol.Lambda:
+                    bits = 0
+                    for next_state in next_states:
+                        bits |= closures[index[next_state]]
+                    move[char] = bits
+            moves.append(move)
+
+        final_bits = 0
+        for state in self.final_states:
+            final_bits |= 1 << index[state]
+        tagged_bits = 0
+        for state in self.tags:
+            tagged_bits |= 1 << index[state]
 
-        kola = [miInicial]
+        res = AFD()
+        res.alphabet = set(self.alphabet)
+        res.classes = self.classes
+
+        def add_subset(subset: int):
+            """Agrega el estado del AFD para un subconjunto, con sus etiquetas."""
+            if max_states is not None and len(ids) >= max_states:
+                raise StateLimitExceeded(max_states)
+            if budget is not None:
+                budget.check_dfa(len(ids) + 1, transitions)
+            ids[subset] = len(ids)
+            res.add_state(ids[subset], subset & final_bits != 0)
+            bits, tags = subset & tagged_bits, 0
+            while bits:
+                low = bits & -bits
+                bits ^= low
+                tags |= self.tags[states[low.bit_length() - 1]]
+            if tags != 0:
+                res.tags[ids[subset]] = tags
+
+        inicial = closures[index[self.initial_state]]
+        ids = {}
+        transitions = 0
+        add_subset(inicial)
+        res.mark_initial_state(0)
+
+        kola = [inicial]
         while len(kola) != 0:
-            elemSet = kola.pop()
-            
-            for letra in self.alphabet:
-                deltaLetra = set()
-                for estado in elemSet:
-                    if letra in self.transitions[estado]:
-                        deltaLetra = deltaLetra.union(self.transitions[estado][letra])                
-                miNuevoEstado = self.lambda_closure(deltaLetra)
-                nombreNuevo = arreglar(miNuevoEstado)
-
-                if nombreNuevo not in res.states:
-                    kola.append(miNuevoEstado)
-                    if len(miNuevoEstado.intersection(self.final_states)) != 0:
-                        res.add_state(nombreNuevo, True)
-                    else:
-                        res.add_state(nombreNuevo)
-                res.add_transition(arreglar(elemSet), nombreNuevo, letra)
-
-        res.normalize_states()
+            subset = kola.pop()
+            deltas = dict.fromkeys(self.alphabet, 0) if complete else {}
+            bits = subset
+            while bits:
+                low = bits & -bits
+                bits ^= low
+                for char, next_bits in moves[low.bit_length() - 1].items():
+                    deltas[char] = deltas.get(char, 0) | next_bits
+
+            for char, next_subset in deltas.items():
+                if next_subset == 0 and not complete:
+                    continue
+                if next_subset not in ids:
+                    add_subset(next_subset)
+                    kola.append(next_subset)
+                res.add_transition(ids[subset], ids[next_subset], char)
+            transitions += len(deltas)
+
         return res
 
+    def _closure_bitsets(self, states: list, index: dict) -> list[int]:
+        """
+        Calcula la clausura lambda de cada estado como bitset (según `index`).
+        Cuando el recorrido llega a un estado cuya clausura ya se conoce, la
+        agrega entera en lugar de volver a recorrerla.
+        """
+        closures = [None] * len(states)
+        for i, state in enumerate(states):
+            bits = 1 << i
+            kola = [state]
+            while len(kola) > 0:
+                current = kola.pop()
+                for next_state in self.transitions[current].get(SpecialSymbol.Lambda, ()):
+                    j = index[next_state]
+                    if not bits >> j & 1:
+                        if closures[j] is not None:
+                            bits |= closures[j]
+                        else:
+                            bits |= 1 << j
+                            kola.append(next_state)
+            closures[i] = bits
+        return closures
+
     def _rename_state_in_transitions(self, old_name: Hashable, new_name: Hashable):
         """Renombra un estado dentro de las transiciones del autómata."""
         self.transitions[new_name] = self.transitions[old_name]
@@ -104,7 +214,7 @@ class AFND(AF):
         transitions = {}
         for char in self._get_extended_alphabet():
             if char in self.transitions[state]:
-                transitions[char] = ",".join(self.transitions[state][char])
+                transitions[char] = ",".join(map(str, self.transitions[state][char]))
             else:
                 transitions[char] = "-"
         return transitions
@@ -0,0 +1,106 @@
+from automata.afnd import AFND, SpecialSymbol
+from automata.classes import AlphabetClasses
+
+__all__ = ["BitParallelAFND"]
+
+
+class BitParallelAFND:
+    """
+    Reconocedor bit-paralelo (Shift-And generalizado, como el de Navarro y
+    Raffinot) sobre el autómata de posiciones (Glushkov) de una expresión:
+    el conjunto de posiciones activas es un entero D, con el bit p prendido
+    si la posición p está activa (la 0 es el estado inicial).
+
+    En el autómata de posiciones todas las transiciones que llegan a una
+    posición tienen la misma clase, así que alcanza con una máscara B[k]
+    por clase (las posiciones que se leen con la clase k) y un paso es
+        D' = (seguidores de D) & B[k]
+    Los seguidores se calculan separando las transiciones en tres tipos (las
+    del estado inicial se usan sólo para el primer carácter):
+    - de p a p + 1 (las de la concatenación): ((D << 1) & shift);
+    - de p a p (las clausuras de una sola posición): (D & loops);
+    - las demás (excepciones), agrupadas por su conjunto de destinos: si
+      alguna posición del grupo está activa, se agregan todos sus destinos.
+    Así cada carácter cuesta unas pocas operaciones con enteros más una por
+    grupo de excepciones, y construirlo no requiere determinizar.
+    """
+
+    def __init__(self, afnd: AFND):
+        if afnd.initial_state != 0 or afnd.states != set(range(afnd.size())):
+            raise ValueError("El autómata de posiciones debe tener estados 0..n-1, con 0 como inicial.")
+        classes = afnd.classes
+        if classes is None:
+            # El alfabeto son caracteres: cada uno es su propia clase
+            classes = AlphabetClasses([[(ord(char), ord(char))] for char in sorted(afnd.alphabet)])
+        self.classes = classes
+        self.n_classes = len(classes)
+        self.n_positions = afnd.size()
+
+        self._masks = [0] * self.n_classes
+        # El estado inicial sólo está activo antes del primer carácter: sus
+        # transiciones van aparte, así no son excepciones
+        self._first = 0
+        self._shift = 0
+        self._loops = 0
+        groups = {}
+        # Clases de cada transición (p, q), para verificar que es un autómata de posiciones
+        edges = {}
+        for p in range(self.n_positions):
+            exceptions = 0
+            for symbol, targets in afnd.transitions[p].items():
+                if symbol is SpecialSymbol.Lambda:
+                    raise ValueError("El autómata de posiciones no tiene transiciones lambda.")
+                k = symbol if afnd.classes is not None else classes.lookup(symbol)
+                for q in targets:
+                    edges.setdefault((p, q), set()).add(k)
+                    self._masks[k] |= 1 << q
+                    if p == 0:
+                        self._first |= 1 << q
+                    elif q == p + 1:
+                        self._shift |= 1 << q
+                    elif q == p:
+                        self._loops |= 1 << q
+                    else:
+                        exceptions |= 1 << q
+            if exceptions != 0:
+                groups[exceptions] = groups.get(exceptions, 0) | 1 << p
+        for (p, q), symbols in edges.items():
+            if any((self._masks[k] >> q) & 1 and k not in symbols for k in range(self.n_classes)):
+                raise ValueError("El autómata no es un autómata de posiciones.")
+        self._exceptions = [(sources, targets) for targets, sources in groups.items()]
+        self._final_bits = 0
+        for p in afnd.final_states:
+            self._final_bits |= 1 << p
+
+    def size(self) -> int:
+        """Devuelve la cantidad de posiciones (incluyendo el estado inicial)."""
+        return self.n_positions
+
+    def translate(self, word: str):
+        """Devuelve los ids de las clases de los caracteres de la cadena (ver `AlphabetClasses.translate`)."""
+        return self.classes.translate(word)
+
+    def match_string(self, word: str) -> bool:
+        """Indica si el autómata acepta la cadena dada."""
+        masks, shift, loops, exceptions = self._masks, self._shift, self._loops, self._exceptions
+        codes = iter(self.classes.translate(word))
+        code = next(codes, None)
+        if code is None:
+            return self._final_bits & 1 == 1
+        active = self._first & masks[code]
+        if len(exceptions) == 0:
+            # Sin excepciones el paso son sólo operaciones con enteros
+            for code in codes:
+                if active == 0:
+                    return False
+                active = ((active << 1) & shift | active & loops) & masks[code]
+            return active & self._final_bits != 0
+        for code in codes:
+            if active == 0:
+                return False
+            follow = (active << 1) & shift | active & loops
+            for sources, targets in exceptions:
+                if active & sources:
+                    follow |= targets
+            active = follow & masks[code]
+        return active & self._final_bits != 0
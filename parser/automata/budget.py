@@ -0,0 +1,67 @@
+from time import perf_counter
+
+from automata.errors import BudgetExceeded
+
+__all__ = ["Budget"]
+
+
+class Budget:
+    """
+    Límites para construir autómatas: cantidad de estados del AFND
+    (`nfa_states`) y del AFD (`dfa_states`), tiempo (`seconds`) y memoria
+    aproximada (`memory`, en bytes). Los límites en None no se controlan.
+
+    `RegEx.to_afnd`, `RegEx.to_position_automaton`, `AFND.determinize` y
+    `AFD.minimize` los verifican mientras construyen y lanzan
+    `BudgetExceeded` apenas se pasa alguno, así una expresión patológica no
+    llega a ocupar toda la memoria ni a trabar el proceso.
+
+    El tiempo se cuenta desde `start` (o desde el primer control, si no se
+    llamó). `RegEx.compile` lo llama antes de construir cada motor, así el
+    mismo presupuesto sirve para compilar muchas expresiones. La memoria se
+    estima con la cantidad de estados y transiciones del autómata que se
+    está construyendo (ver `STATE_BYTES` y `TRANSITION_BYTES`).
+    """
+
+    # Bytes que ocupa en promedio cada estado (con su diccionario de
+    # transiciones) y cada transición de un AF
+    STATE_BYTES = 200
+    TRANSITION_BYTES = 100
+
+    def __init__(self, nfa_states: int = None, dfa_states: int = None, seconds: float = None, memory: int = None):
+        for name, limit in [("nfa_states", nfa_states), ("dfa_states", dfa_states), ("seconds", seconds),
+                            ("memory", memory)]:
+            if limit is not None and limit <= 0:
+                raise ValueError(f"El límite {name} tiene que ser positivo.")
+        self.nfa_states = nfa_states
+        self.dfa_states = dfa_states
+        self.seconds = seconds
+        self.memory = memory
+        self._deadline = None
+
+    def start(self) -> "Budget":
+        """Empieza a contar el tiempo. Devuelve el mismo presupuesto para poder encadenar llamados."""
+        self._deadline = perf_counter() + self.seconds if self.seconds is not None else None
+        return self
+
+    def check_nfa(self, states: int, transitions: int = 0):
+        """Verifica los límites para un AFND con la cantidad dada de estados y transiciones."""
+        if self.nfa_states is not None and states > self.nfa_states:
+            raise BudgetExceeded("nfa_states", self.nfa_states)
+        self.check(states, transitions)
+
+    def check_dfa(self, states: int, transitions: int = 0):
+        """Verifica los límites para un AFD con la cantidad dada de estados y transiciones."""
+        if self.dfa_states is not None and states > self.dfa_states:
+            raise BudgetExceeded("dfa_states", self.dfa_states)
+        self.check(states, transitions)
+
+    def check(self, states: int = 0, transitions: int = 0):
+        """Verifica el tiempo, y la memoria de un autómata con la cantidad dada de estados y transiciones."""
+        if self.memory is not None and states * self.STATE_BYTES + transitions * self.TRANSITION_BYTES > self.memory:
+            raise BudgetExceeded("memory", self.memory)
+        if self.seconds is not None:
+            if self._deadline is None:
+                self.start()
+            elif perf_counter() > self._deadline:
+                raise BudgetExceeded("seconds", self.seconds)
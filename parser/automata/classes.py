@@ -0,0 +1,134 @@
+import sys
+from bisect import bisect_right
+from typing import Hashable, Iterable
+
+__all__ = ["AlphabetClasses"]
+
+
+class AlphabetClasses:
+    """
+    Partición de un alfabeto en clases de caracteres equivalentes.
+
+    Se construye a partir de conjuntos de caracteres, cada uno dado como una
+    lista de intervalos (lo, hi) de códigos (por ejemplo, las clases de
+    caracteres de una expresión regular): dos caracteres quedan en la misma
+    clase si pertenecen exactamente a los mismos conjuntos, y por lo tanto
+    ningún autómata construido a partir de esos conjuntos los distingue.
+    Las clases se numeran 0..n-1 y la clase `rest` (la última) agrupa a todos
+    los caracteres que no aparecen en ningún conjunto (y puede ser vacía, ver
+    `empty_rest`).
+    """
+
+    def __init__(self, sets: Iterable[Iterable[tuple[int, int]]]):
+        sets = [list(intervals) for intervals in sets]
+        bounds = sorted({code for intervals in sets for lo, hi in intervals for code in (lo, hi + 1)})
+
+        # Cada intervalo elemental [bounds[i], bounds[i + 1]) está contenido
+        # entero en cada conjunto que lo toca: su firma son esos conjuntos
+        signatures = [[] for _ in range(max(len(bounds) - 1, 0))]
+        for i, intervals in enumerate(sets):
+            for lo, hi in intervals:
+                j = bisect_right(bounds, lo) - 1
+                while bounds[j] <= hi:
+                    if len(signatures[j]) == 0 or signatures[j][-1] != i:
+                        signatures[j].append(i)
+                    j += 1
+
+        ids = {}
+        self.members = []
+        elementary = []
+        for j, signature in enumerate(signatures):
+            if len(signature) == 0:
+                elementary.append(None)
+                continue
+            signature = tuple(signature)
+            if signature not in ids:
+                ids[signature] = len(self.members)
+                self.members.append([])
+            k = ids[signature]
+            lo, hi = bounds[j], bounds[j + 1] - 1
+            if len(self.members[k]) > 0 and self.members[k][-1][1] == lo - 1:
+                self.members[k][-1] = (self.members[k][-1][0], hi)
+            else:
+                self.members[k].append((lo, hi))
+            elementary.append(k)
+
+        self.rest = len(self.members)
+        self._bounds = bounds
+        self._elementary = [self.rest if k is None else k for k in elementary]
+        # Indica si los conjuntos cubren todos los caracteres
+        self.empty_rest = (len(bounds) > 0 and bounds[0] == 0 and bounds[-1] > sys.maxunicode
+                           and None not in elementary)
+        # Tabla de consulta: se completa a medida que aparecen caracteres nuevos
+        self.class_of = _ClassTable(self)
+        # Tabla para `bytes.translate` (ver `translate`), si hay a lo sumo 256 clases
+        self._byte_table = None
+
+    def __len__(self) -> int:
+        """Devuelve la cantidad de clases (incluyendo la de los caracteres que no aparecen)."""
+        return self.rest + 1
+
+    def lookup(self, char: Hashable) -> int:
+        """Devuelve la clase de un carácter cualquiera (dado como str o como código)."""
+        return self.class_of[char]
+
+    def representative(self, k: int) -> str:
+        """Devuelve un carácter de la clase k (que no sea la de los caracteres que no aparecen)."""
+        return chr(self.members[k][0][0])
+
+    def classes_in(self, intervals: Iterable[tuple[int, int]]) -> list[int]:
+        """Devuelve las clases que tienen caracteres en los intervalos dados."""
+        res = set()
+        for lo, hi in intervals:
+            j = bisect_right(self._bounds, lo) - 1
+            if j < 0 or j >= len(self._elementary):
+                res.add(self.rest)
+                j = max(j, 0)
+            while j < len(self._elementary) and self._bounds[j] <= hi:
+                res.add(self._elementary[j])
+                j += 1
+            if len(self._bounds) == 0 or hi >= self._bounds[-1]:
+                res.add(self.rest)
+        return sorted(res)
+
+    def translate(self, word: str):
+        """
+        Devuelve las clases de los caracteres de la cadena, de una sola vez:
+        si la cadena es latin-1 (o es un `bytes`, cuyos bytes se toman como
+        los caracteres con esos códigos) y hay a lo sumo 256 clases, como
+        `bytes` con `bytes.translate`; si no, como lista.
+        """
+        if self.rest < 256:
+            if self._byte_table is None:
+                self._byte_table = bytes(self.lookup(code) for code in range(256))
+            if type(word) is bytes:
+                return word.translate(self._byte_table)
+            try:
+                return word.encode("latin-1").translate(self._byte_table)
+            except UnicodeEncodeError:
+                pass
+        return list(map(self.class_of.__getitem__, word))
+
+    def _classify(self, code: int) -> int:
+        """(Interno) Busca la clase de un código en los intervalos elementales."""
+        j = bisect_right(self._bounds, code) - 1
+        if j < 0 or j >= len(self._elementary):
+            return self.rest
+        return self._elementary[j]
+
+
+class _ClassTable(dict):
+    """
+    Diccionario de caracteres (str o código) a clases que se completa solo:
+    las claves que faltan se buscan en los intervalos y se guardan. Sirve
+    tanto para indexar como para `str.translate`.
+    """
+
+    def __init__(self, classes: AlphabetClasses):
+        super().__init__()
+        self._classes = classes
+
+    def __missing__(self, key: Hashable) -> int:
+        k = self._classes._classify(key if isinstance(key, int) else ord(key))
+        self[key] = k
+        return k
@@ -0,0 +1,255 @@
+import sys
+
+from automata.frozen import FrozenAFD, DEAD, NORMAL, UNIVERSAL
+
+__all__ = ["DenseAFD"]
+
+
+class DenseAFD(FrozenAFD):
+    """
+    AFD compilado en una tabla densa: las transiciones se guardan en una única
+    lista indexada por `estado * n_classes + clase` (indexar un `array` crea
+    un entero nuevo en cada paso, indexar una lista no). Para no multiplicar
+    en cada paso, la tabla guarda directamente el desplazamiento del estado
+    destino (`destino * n_classes`), así que reconocer una cadena es una
+    indexación por carácter. Cada desplazamiento es un único entero que
+    comparten todas las transiciones a ese estado. Las transiciones a estados muertos o
+    universales guardan DEAD o UNIVERSAL (negativos) y cortan el recorrido.
+
+    Los estados acelerados son los que vuelven a sí mismos con casi todos
+    los caracteres: sólo salen con clases que juntas tienen a lo sumo
+    `ACCELERATION_LIMIT` caracteres (como el Σ* del principio del AFD de
+    `RegEx.search`, del que se sale con el primer carácter de la expresión).
+    Si se sale con una clase grande (por ejemplo, la de los espacios en
+    [a-z]*), la salida es frecuente y saltar no conviene. Al entrar en uno,
+    en lugar de avanzar de a un carácter se salta hasta la próxima aparición
+    de alguna de esas clases con `bytes.find` sobre la cadena ya traducida
+    (como en Hyperscan), y se sigue recorriendo la misma tabla desde ahí. Las
+    posiciones encontradas se recuerdan durante el recorrido, así cada clase
+    se busca a lo sumo una vez por tramo de la cadena. Sólo se acelera en
+    cadenas de al menos `ACCELERATION_MIN_LENGTH` caracteres. `skipped`
+    cuenta los caracteres salteados.
+    """
+
+    # Cantidad máxima de caracteres con los que sale un estado acelerado
+    ACCELERATION_LIMIT = 3
+    # Cantidad máxima de caracteres con los que empiezan las cadenas aceptadas
+    # para mirar el primero antes de traducir (ver `match_string`)
+    PROBE_LIMIT = 3
+    # En cadenas más cortas preparar los saltos cuesta más de lo que ahorran
+    # (ver `benchmarks.acceleration`)
+    ACCELERATION_MIN_LENGTH = 32
+    # Largo hasta el que las cadenas se traducen de una vez, y del primer tramo de las más largas
+    # (ver `match_string`)
+    CHUNK_LENGTH = 64
+
+    def nbytes(self) -> int:
+        """
+        Devuelve la cantidad de bytes que ocupa todo lo que guarda el
+        autómata: la lista, los enteros de los desplazamientos, las tablas
+        en el orden de las filas y las de `FrozenAFD`.
+        """
+        offsets = {id(target): target for target in self.table if target >= 0}
+        return (sys.getsizeof(self.table) + sum(map(sys.getsizeof, offsets.values()))
+                + sys.getsizeof(self._accepting) + sys.getsizeof(self._accelerated)
+                + (sys.getsizeof(self._tags) if self._tags is not None else 0) + self._frozen_nbytes())
+
+    def match_string(self, word: str) -> bool:
+        """
+        Indica si el autómata acepta la cadena dada.
+
+        Las cadenas de hasta `CHUNK_LENGTH` caracteres (casi todas las
+        líneas) se traducen a clases de una vez y se recorren. Las más largas
+        se traducen de a poco (ver `_match_long`). Si las cadenas aceptadas
+        empiezan con a lo sumo `PROBE_LIMIT` caracteres distintos (como en
+        whale[a-z]*), casi todas las demás se rechazan en el primero: en ese
+        caso se mira antes de traducir.
+        """
+        table = self.table
+        state = self._start
+        if state < 0:
+            return state == UNIVERSAL
+        class_of = self._probe_first
+        if class_of is not None and word:
+            first = table[state + class_of[word[0]]]
+            if first < 0:
+                return first == UNIVERSAL
+        if len(word) > self.CHUNK_LENGTH:
+            return self._match_long(word, state)
+        codes = self.classes.translate(word)
+        if self._accelerated_limit > 0 and len(word) >= self.ACCELERATION_MIN_LENGTH and type(codes) is bytes:
+            state = self._walk_accelerated(codes, state)
+            if state < 0:
+                return state == UNIVERSAL
+            return self._accepting[state // self.n_classes] == 1
+        for code in codes:
+            state = table[state + code]
+            if state < 0:
+                return state == UNIVERSAL
+        return self._accepting[state // self.n_classes] == 1
+
+    def _match_long(self, word: str, state: int) -> bool:
+        """
+        (Interno) Indica si el autómata acepta una cadena de más de
+        `CHUNK_LENGTH` caracteres desde el estado dado. Antes de traducir se
+        mira sólo el primer carácter (muchas de las cadenas que se rechazan
+        mueren ahí), y después se traduce en tramos de `CHUNK_LENGTH`
+        caracteres que van duplicando su largo. Así, cortar en un estado
+        muerto o universal cuesta lo leído hasta ese momento y no el largo
+        de toda la cadena.
+        """
+        table = self.table
+        # Muchas cadenas que se rechazan mueren en el primer carácter: se mira antes de traducir
+        first = table[state + self.classes.class_of[word[0]]]
+        if first < 0:
+            return first == UNIVERSAL
+        translate = self.classes.translate
+        accelerate = self._accelerated_limit > 0 and len(word) >= self.ACCELERATION_MIN_LENGTH
+        start, size = 0, self.CHUNK_LENGTH
+        while start < len(word):
+            codes = translate(word[start:start + size])
+            if accelerate and type(codes) is bytes:
+                state = self._walk_accelerated(codes, state)
+            else:
+                for code in codes:
+                    state = table[state + code]
+                    if state < 0:
+                        break
+            if state < 0:
+                return state == UNIVERSAL
+            start += size
+            size *= 2
+        return self._accepting[state // self.n_classes] == 1
+
+    def _walk_accelerated(self, codes: bytes, state: int) -> int:
+        """
+        (Interno) Recorre la cadena ya traducida desde el estado dado (un
+        desplazamiento) saltando los tramos de los estados acelerados, y
+        devuelve el estado en el que termina (o DEAD o UNIVERSAL, si corta
+        antes). Como sus filas son las primeras de la tabla, el recorrido se
+        detiene en ellos con la misma comparación que en DEAD y UNIVERSAL
+        (`state < _accelerated_limit`), y sigue desde la posición a la que
+        se saltó.
+        """
+        table, accelerated, limit = self.table, self._accelerated, self._accelerated_limit
+        n = len(codes)
+        found = {}
+        i = 0
+        while True:
+            if state < limit:
+                # Se salta hasta la próxima clase con la que se sale del estado
+                j = n
+                for k in accelerated[state]:
+                    p = found.get(k, -1)
+                    if p < i:
+                        p = codes.find(k, i)
+                        p = n if p == -1 else p
+                        found[k] = p
+                    if p < j:
+                        j = p
+                self.skipped += j - i
+                i = j
+            for i in range(i, n):
+                state = table[state + codes[i]]
+                if state < limit:
+                    break
+            else:
+                return state
+            if state < 0:
+                return state
+            i += 1
+
+    def match_tags(self, word: str) -> int:
+        """
+        Devuelve las etiquetas (`tags`) del estado en el que termina el
+        recorrido de la cadena, o 0 si no es un estado final etiquetado.
+        """
+        delta = self.table
+        state = self._start
+        if state < 0 or self.tags is None:
+            return 0
+        for code in self.translate(word):
+            state = delta[state + code]
+            if state < 0:
+                return 0
+        return self._tags[state // self.n_classes]
+
+    def prefix_ends(self, codes) -> bytearray:
+        """
+        Recibe una cadena ya traducida a clases (`translate`) y devuelve, para
+        cada i de 0 a n, un 1 en la posición i si el autómata acepta los
+        primeros i símbolos y un 0 si no.
+        """
+        delta, accepting, width = self.table, self._accepting, self.n_classes
+        res = bytearray(len(codes) + 1)
+        state = self._start
+        i = 0
+        while state >= 0:
+            res[i] = accepting[state // width]
+            if i == len(codes):
+                return res
+            state = delta[state + codes[i]]
+            i += 1
+        if state == UNIVERSAL:
+            res[i:] = b"\x01" * (len(codes) + 1 - i)
+        return res
+
+    def longest_prefix(self, codes, start: int = 0) -> int:
+        """
+        Recibe una cadena ya traducida a clases (`translate`) y devuelve el
+        mayor `end` tal que el autómata acepta los símbolos de `start` a `end`,
+        o -1 si no acepta ninguno. Deja de leer al entrar en un estado muerto
+        o universal.
+        """
+        delta, accepting, width = self.table, self._accepting, self.n_classes
+        end = -1
+        state = self._start
+        i = start
+        while state >= 0:
+            if accepting[state // width]:
+                end = i
+            if i == len(codes):
+                return end
+            state = delta[state + codes[i]]
+            i += 1
+        return len(codes) if state == UNIVERSAL else end
+
+    def _build(self, rows: list[dict[int, int]]):
+        """
+        (Interno) Arma la tabla densa, con DEAD donde no hay transición. Las
+        filas de los estados acelerados van primero, así sus desplazamientos
+        son los menores a `_accelerated_limit`; `_accepting` y `_tags` son
+        `accepting` y `tags` en el orden de las filas.
+        """
+        width = self.n_classes
+        # Cantidad de caracteres de cada clase: `rest` tiene todos los que no están en las demás
+        sizes = [sum(hi - lo + 1 for lo, hi in intervals) for intervals in self.classes.members]
+        sizes.append(sys.maxunicode + 1 - sum(sizes))
+        # Estados acelerados y las clases con las que salen
+        exits_of = {}
+        for i, row in enumerate(rows):
+            if self.kind[i] != NORMAL:
+                continue
+            # Si la clase `rest` es vacía nunca aparece en la cadena
+            exits = [k for k in range(width - 1 if self.classes.empty_rest else width) if row.get(k) != i]
+            if 0 < len(exits) < width and sum(sizes[k] for k in exits) <= self.ACCELERATION_LIMIT:
+                exits_of[i] = tuple(exits)
+        order = list(exits_of) + [i for i in range(self.n_states) if i not in exits_of]
+        offset = [0] * self.n_states
+        for position, i in enumerate(order):
+            offset[i] = position * width
+
+        self.table = [DEAD] * (self.n_states * width)
+        for i, row in enumerate(rows):
+            for k, target in row.items():
+                target = self._target(target)
+                self.table[offset[i] + k] = offset[target] if target >= 0 else target
+        self._start = offset[0] if self._start == NORMAL else self._start
+        self._accepting = bytes(self.accepting[i] for i in order)
+        self._tags = [self.tags[i] for i in order] if self.tags is not None else None
+        self._accelerated = {offset[i]: exits for i, exits in exits_of.items()}
+        self._accelerated_limit = len(exits_of) * width
+        # Si se mira el primer carácter antes de traducir, la tabla de clases con la que se lo busca
+        first = [k for k, target in rows[0].items() if self._target(target) != DEAD]
+        self._probe_first = self.classes.class_of if sum(sizes[k] for k in first) <= self.PROBE_LIMIT else None
+        self.skipped = 0
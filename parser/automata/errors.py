@@ -0,0 +1,31 @@
+__all__ = ["BudgetExceeded", "StateLimitExceeded"]
+
+
+class BudgetExceeded(ValueError):
+    """
+    Se lanza cuando construir un autómata pasa de alguno de los límites de
+    un presupuesto (ver `Budget`). `resource` indica cuál: "nfa_states",
+    "dfa_states", "seconds" o "memory" (en bytes), y `limit` su valor.
+    """
+
+    MESSAGES = {
+        "nfa_states": "El AFND tiene más de {} estados.",
+        "dfa_states": "El autómata tiene más de {} estados.",
+        "seconds": "Construir el autómata tarda más de {} segundos.",
+        "memory": "El autómata ocupa más de {} bytes.",
+    }
+
+    def __init__(self, resource: str, limit):
+        super().__init__(self.MESSAGES[resource].format(limit))
+        self.resource = resource
+        self.limit = limit
+
+
+class StateLimitExceeded(BudgetExceeded):
+    """
+    Se lanza cuando construir un autómata (por ejemplo, determinizar un
+    AFND) necesita más estados que el máximo permitido.
+    """
+
+    def __init__(self, limit: int):
+        super().__init__("dfa_states", limit)
@@ -0,0 +1,148 @@
+import sys
+from abc import ABC, abstractmethod
+from array import array
+
+from automata.afd import AFD
+from automata.classes import AlphabetClasses
+
+__all__ = ["FrozenAFD", "NORMAL", "DEAD", "UNIVERSAL"]
+
+# Tipos de estados. DEAD y UNIVERSAL son también los valores que guardan las
+# tablas en lugar del estado destino, para que el reconocedor corte ahí.
+NORMAL = 0
+DEAD = -1
+UNIVERSAL = -2
+
+
+class FrozenAFD(ABC):
+    """
+    Clase abstracta para las formas compiladas (inmutables) de un AFD, que
+    sólo sirven para reconocer cadenas rápido.
+
+    Los estados se renumeran 0..n-1 (el inicial es el 0) más un estado trampa
+    explícito n, los símbolos son siempre ids de clases del alfabeto y los
+    estados finales son un `bytes` con un 1 por estado final. Cada subclase
+    decide cómo guarda la tabla de transiciones.
+
+    Al compilar, cada estado se clasifica (`kind`) en muerto (DEAD: desde él
+    no se llega a ningún estado final, como el estado trampa), universal
+    (UNIVERSAL: final y del que sólo se sale hacia estados universales, así
+    que acepta cualquier resto de la cadena) o normal. Las tablas guardan
+    DEAD o UNIVERSAL en lugar de esos destinos, así el reconocedor termina
+    apenas entra en uno, sin leer el resto de la cadena.
+
+    Si el AFD tiene etiquetas (`tags`, ver `RegexSet`), se guardan en una
+    lista por estado y no se marcan estados universales: para saber qué
+    patrones aceptan hay que saber en qué estado termina el recorrido.
+
+    Los caracteres se traducen a clases de una sola vez (ver
+    `AlphabetClasses.translate`).
+    """
+
+    def __init__(self, afd: AFD):
+        classes = afd.classes
+        if classes is None:
+            # El alfabeto son caracteres: cada uno es su propia clase
+            alphabet = sorted(afd.alphabet)
+            classes = AlphabetClasses([[(ord(char), ord(char))] for char in alphabet])
+            symbols = {char: classes.lookup(char) for char in alphabet}
+        else:
+            symbols = {k: k for k in afd.alphabet}
+
+        names = {afd.initial_state: 0}
+        for state in afd.states:
+            if state not in names:
+                names[state] = len(names)
+
+        self.classes = classes
+        self.n_classes = len(classes)
+        self.n_states = len(names) + 1
+        self.sink = len(names)
+        accepting = bytearray(self.n_states)
+        for state in afd.final_states:
+            accepting[names[state]] = 1
+        self.accepting = bytes(accepting)
+        if len(afd.tags) > 0:
+            self.tags = [0] * self.n_states
+            for state, tags in afd.tags.items():
+                self.tags[names[state]] = tags
+        else:
+            self.tags = None
+
+        rows = [{} for _ in range(self.n_states)]
+        for state, i in names.items():
+            for symbol, target in afd.transitions[state].items():
+                rows[i][symbols[symbol]] = names[target]
+        self.kind = self._classify(rows)
+        self._start = 0 if self.kind[0] == NORMAL else self.kind[0]
+        self._build(rows)
+
+    def size(self) -> int:
+        """Devuelve la cantidad de estados (incluyendo el estado trampa)."""
+        return self.n_states
+
+    @abstractmethod
+    def nbytes(self) -> int:
+        """Devuelve la cantidad de bytes que ocupa todo lo que guarda el autómata."""
+        pass
+
+    @abstractmethod
+    def match_string(self, word: str) -> bool:
+        """Indica si el autómata acepta la cadena dada."""
+        pass
+
+    @abstractmethod
+    def _build(self, rows: list[dict[int, int]]):
+        """
+        (Interno) Arma la tabla de transiciones a partir de las filas de cada
+        estado (clase -> estado destino). Lo que falta va al estado trampa.
+        """
+        pass
+
+    def _frozen_nbytes(self) -> int:
+        """(Interno) Devuelve los bytes de lo que guardan todas las formas compiladas: `accepting`, `kind` y `tags`."""
+        res = sys.getsizeof(self.accepting) + sys.getsizeof(self.kind)
+        if self.tags is not None:
+            res += sys.getsizeof(self.tags) + sum(map(sys.getsizeof, self.tags))
+        return res
+
+    def _target(self, state: int) -> int:
+        """(Interno) Devuelve el valor a guardar en la tabla para una transición al estado dado."""
+        return state if self.kind[state] == NORMAL else self.kind[state]
+
+    def _classify(self, rows: list[dict[int, int]]) -> array:
+        """(Interno) Clasifica los estados en muertos, universales y normales."""
+        # Si la clase `rest` es vacía, que no tenga transiciones no importa
+        n_classes = self.n_classes - 1 if self.classes.empty_rest else self.n_classes
+        targets = [[row.get(k, self.sink) for k in range(n_classes)] for row in rows]
+
+        # Vivos: los estados desde los que se llega a un estado final
+        inverse = [[] for _ in rows]
+        for i, row in enumerate(targets):
+            for j in set(row):
+                inverse[j].append(i)
+        alive = [self.accepting[i] == 1 for i in range(self.n_states)]
+        pending = [i for i in range(self.n_states) if alive[i]]
+        while len(pending) > 0:
+            j = pending.pop()
+            for i in inverse[j]:
+                if not alive[i]:
+                    alive[i] = True
+                    pending.append(i)
+
+        # Universales: el mayor conjunto de estados finales cerrado por transiciones
+        universal = [self.accepting[i] == 1 and self.tags is None for i in range(self.n_states)]
+        changed = True
+        while changed:
+            changed = False
+            for i in range(self.n_states):
+                if universal[i] and not all(universal[j] for j in targets[i]):
+                    universal[i] = False
+                    changed = True
+
+        return array("b", [DEAD if not alive[i] else UNIVERSAL if universal[i] else NORMAL
+                           for i in range(self.n_states)])
+
+    def translate(self, word: str):
+        """Devuelve los ids de las clases de los caracteres de la cadena (ver `AlphabetClasses.translate`)."""
+        return self.classes.translate(word)
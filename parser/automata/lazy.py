@@ -0,0 +1,160 @@
+from automata.afnd import AFND, SpecialSymbol
+from automata.classes import AlphabetClasses
+from automata.frozen import DEAD
+
+__all__ = ["LazyAFD"]
+
+# Transición que todavía no se calculó
+UNKNOWN = -3
+
+
+class LazyAFD:
+    """
+    AFD perezoso (como el de RE2): guarda el AFND y construye los estados
+    del AFD (subconjuntos, como en `AFND.determinize`) recién cuando la
+    cadena llega a ellos. Las transiciones ya calculadas quedan en una tabla
+    densa como la de `DenseAFD` (desplazamientos `estado * n_classes`), con
+    UNKNOWN en las que faltan, así los caminos que se repiten se recorren a
+    velocidad de AFD.
+
+    La tabla tiene a lo sumo `max_states` estados (ocupa unos
+    `max_states * n_classes` enteros). Si hace falta uno más, se vacía
+    entera (`flush`) y se vuelve a empezar desde el estado inicial y el
+    estado actual del recorrido. `flushes` cuenta cuántas veces pasó: si son
+    muchas, el AFD no entra en la memoria pedida y conviene darle más.
+    """
+
+    def __init__(self, afnd: AFND, max_states: int = 10000):
+        # Después de vaciar la tabla hacen falta el estado inicial, el actual y el siguiente
+        if max_states < 3:
+            raise ValueError("El AFD perezoso necesita lugar para al menos 3 estados.")
+        classes = afnd.classes
+        if classes is None:
+            # El alfabeto son caracteres: cada uno es su propia clase
+            classes = AlphabetClasses([[(ord(char), ord(char))] for char in sorted(afnd.alphabet)])
+        self.classes = classes
+        self.n_classes = len(classes)
+        self.max_states = max_states
+        self.flushes = 0
+
+        states = list(afnd.states)
+        index = {state: i for i, state in enumerate(states)}
+        closures = afnd._closure_bitsets(states, index)
+        # Para cada estado del AFND, clase -> bitset (ya clausurado) de destinos
+        self._moves = []
+        for state in states:
+            move = {}
+            for symbol, next_states in afnd.transitions[state].items():
+                if symbol is SpecialSymbol.Lambda:
+                    continue
+                k = symbol if afnd.classes is not None else classes.lookup(symbol)
+                bits = move.get(k, 0)
+                for next_state in next_states:
+                    bits |= closures[index[next_state]]
+                move[k] = bits
+            self._moves.append(move)
+        self._final_bits = 0
+        for state in afnd.final_states:
+            self._final_bits |= 1 << index[state]
+        self._initial = closures[index[afnd.initial_state]]
+        self.flush()
+
+    def size(self) -> int:
+        """Devuelve la cantidad de estados del AFD construidos hasta ahora."""
+        return len(self._subsets)
+
+    def nbytes(self) -> int:
+        """Devuelve (aproximadamente) la cantidad de bytes que ocupa la tabla de transiciones."""
+        return 8 * len(self._delta) + len(self.accepting)
+
+    def flush(self):
+        """Vacía la tabla, dejando sólo el estado inicial."""
+        self._ids = {}
+        self._subsets = []
+        self._delta = []
+        self.accepting = bytearray()
+        self._start = self._add(self._initial)
+
+    def translate(self, word: str):
+        """Devuelve los ids de las clases de los caracteres de la cadena (ver `AlphabetClasses.translate`)."""
+        return self.classes.translate(word)
+
+    def match_string(self, word: str) -> bool:
+        """Indica si el autómata acepta la cadena dada."""
+        delta = self._delta
+        state = self._start
+        for code in self.translate(word):
+            target = delta[state + code]
+            if target < 0:
+                if target == DEAD:
+                    return False
+                target = self._step(state, code)
+                if target == DEAD:
+                    return False
+                # Si se vació la tabla, es otra lista
+                delta = self._delta
+            state = target
+        return self.accepting[state // self.n_classes] == 1
+
+    def longest_prefix(self, codes, start: int = 0) -> int:
+        """
+        Recibe una cadena ya traducida a clases (`translate`) y devuelve el
+        mayor `end` tal que el autómata acepta los símbolos de `start` a `end`,
+        o -1 si no acepta ninguno (como `DenseAFD.longest_prefix`). Deja de
+        leer al entrar en el estado muerto.
+        """
+        delta, width = self._delta, self.n_classes
+        end = -1
+        state = self._start
+        i = start
+        while True:
+            if self.accepting[state // width]:
+                end = i
+            if i == len(codes):
+                return end
+            target = delta[state + codes[i]]
+            if target < 0:
+                if target == DEAD:
+                    return end
+                target = self._step(state, codes[i])
+                if target == DEAD:
+                    return end
+                # Si se vació la tabla, es otra lista
+                delta = self._delta
+            state = target
+            i += 1
+
+    def _step(self, state: int, code: int) -> int:
+        """
+        (Interno) Calcula la transición del estado (dado por su
+        desplazamiento) con la clase dada, agregando el estado destino si no
+        existe, y la guarda en la tabla.
+        """
+        subset = self._subsets[state // self.n_classes]
+        next_subset = 0
+        bits = subset
+        while bits:
+            low = bits & -bits
+            bits ^= low
+            next_subset |= self._moves[low.bit_length() - 1].get(code, 0)
+        if next_subset == 0:
+            target = DEAD
+        elif next_subset in self._ids:
+            target = self._ids[next_subset]
+        else:
+            if len(self._subsets) >= self.max_states:
+                self.flush()
+                self.flushes += 1
+                state = self._add(subset)
+            target = self._add(next_subset)
+        self._delta[state + code] = target
+        return target
+
+    def _add(self, subset: int) -> int:
+        """(Interno) Devuelve el desplazamiento del estado de un subconjunto, agregándolo si no existe."""
+        if subset not in self._ids:
+            self._ids[subset] = len(self._subsets) * self.n_classes
+            self._subsets.append(subset)
+            self._delta.extend([UNKNOWN] * self.n_classes)
+            self.accepting.append(1 if subset & self._final_bits else 0)
+        return self._ids[subset]
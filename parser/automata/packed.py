@@ -0,0 +1,84 @@
+import sys
+from array import array
+from collections import Counter
+
+from automata.frozen import FrozenAFD, DEAD, UNIVERSAL
+
+__all__ = ["PackedAFD"]
+
+
+class PackedAFD(FrozenAFD):
+    """
+    AFD compilado en una tabla comprimida por desplazamiento de filas (como
+    las tablas de yacc): cada estado tiene una transición por defecto (su
+    destino más frecuente, casi siempre el estado trampa) y sólo se guardan
+    las transiciones que no son la de defecto.
+
+    Las filas se superponen como peines en dos arreglos `next` y `check`: la
+    transición del estado s con la clase k está en la posición `base[s] + k`
+    si `check[base[s] + k] == s`, y si no es `default[s]`. Las bases se
+    eligen con la primera posición libre, empezando por las filas con más
+    transiciones. Como en `DenseAFD`, las transiciones a estados muertos o
+    universales guardan DEAD o UNIVERSAL y cortan el recorrido.
+    """
+
+    def nbytes(self) -> int:
+        """
+        Devuelve la cantidad de bytes que ocupa todo lo que guarda el
+        autómata: los cuatro arreglos y las tablas de `FrozenAFD`.
+        """
+        tables = (self.base, self.default, self.next, self.check)
+        return sum(map(sys.getsizeof, tables)) + self._frozen_nbytes()
+
+    def match_string(self, word: str) -> bool:
+        """Indica si el autómata acepta la cadena dada."""
+        base, default, next_, check = self.base, self.default, self.next, self.check
+        state = self._start
+        if state >= 0:
+            for code in self.translate(word):
+                i = base[state] + code
+                state = next_[i] if check[i] == state else default[state]
+                if state < 0:
+                    break
+            else:
+                return self.accepting[state] == 1
+        return state == UNIVERSAL
+
+    def _build(self, rows: list[dict[int, int]]):
+        """(Interno) Comprime las filas, con el estado trampa donde no hay transición."""
+        self.base = array("i", [0]) * self.n_states
+        self.default = array("i", [DEAD]) * self.n_states
+        entries = []
+        for i, row in enumerate(rows):
+            row = [self._target(row.get(k, self.sink)) for k in range(self.n_classes)]
+            self.default[i] = Counter(row).most_common(1)[0][0]
+            entries.append([(k, target) for k, target in enumerate(row) if target != self.default[i]])
+
+        next_ = []
+        check = []
+        first_free = 0
+        for i in sorted(range(self.n_states), key=lambda i: -len(entries[i])):
+            if len(entries[i]) == 0:
+                continue
+            offset = entries[i][0][0]
+            b = first_free - offset
+            while not all(b + k >= len(check) or check[b + k] == -1 for k, _ in entries[i]) or b < 0:
+                b += 1
+            self.base[i] = b
+            needed = b + entries[i][-1][0] + 1
+            if needed > len(check):
+                next_.extend([0] * (needed - len(check)))
+                check.extend([-1] * (needed - len(check)))
+            for k, target in entries[i]:
+                next_[b + k] = target
+                check[b + k] = i
+            while first_free < len(check) and check[first_free] != -1:
+                first_free += 1
+
+        # Cualquier base + clase tiene que caer dentro de los arreglos
+        padding = max(self.base) + self.n_classes - len(check)
+        if padding > 0:
+            next_.extend([0] * padding)
+            check.extend([-1] * padding)
+        self.next = array("i", next_)
+        self.check = array("i", check)
@@ -0,0 +1,98 @@
+from automata.afnd import AFND, SpecialSymbol
+from automata.classes import AlphabetClasses
+
+__all__ = ["AFNDSimulation"]
+
+
+class AFNDSimulation:
+    """
+    Reconocedor que simula el AFND directamente (como el de Thompson o la
+    Pike VM de RE2, sin capturas), sin determinizarlo: el conjunto de
+    estados activos es un entero usado como bitset, y en cada paso se juntan
+    los destinos (ya clausurados por lambda) de los estados activos que
+    tienen transiciones con la clase leída. Reconocer una cadena cuesta
+    O(len(cadena) × tamaño del AFND), sin importar cuántos estados tendría
+    el AFD, y construirlo cuesta lo mismo que calcular las clausuras.
+    """
+
+    def __init__(self, afnd: AFND):
+        classes = afnd.classes
+        if classes is None:
+            # El alfabeto son caracteres: cada uno es su propia clase
+            classes = AlphabetClasses([[(ord(char), ord(char))] for char in sorted(afnd.alphabet)])
+        self.classes = classes
+        self.n_classes = len(classes)
+        self.n_states = afnd.size()
+
+        states = list(afnd.states)
+        index = {state: i for i, state in enumerate(states)}
+        closures = afnd._closure_bitsets(states, index)
+        # Por clase: el bitset de los estados que tienen transiciones con ella,
+        # y para cada uno (por su número) el bitset clausurado de sus destinos
+        self._sources = [0] * self.n_classes
+        self._moves = [{} for _ in range(self.n_classes)]
+        for i, state in enumerate(states):
+            for symbol, next_states in afnd.transitions[state].items():
+                if symbol is SpecialSymbol.Lambda:
+                    continue
+                k = symbol if afnd.classes is not None else classes.lookup(symbol)
+                bits = self._moves[k].get(i, 0)
+                for next_state in next_states:
+                    bits |= closures[index[next_state]]
+                self._moves[k][i] = bits
+                self._sources[k] |= 1 << i
+        self._final_bits = 0
+        for state in afnd.final_states:
+            self._final_bits |= 1 << index[state]
+        self._initial = closures[index[afnd.initial_state]]
+
+    def size(self) -> int:
+        """Devuelve la cantidad de estados del AFND."""
+        return self.n_states
+
+    def translate(self, word: str):
+        """Devuelve los ids de las clases de los caracteres de la cadena (ver `AlphabetClasses.translate`)."""
+        return self.classes.translate(word)
+
+    def match_string(self, word: str) -> bool:
+        """Indica si el autómata acepta la cadena dada."""
+        sources, moves = self._sources, self._moves
+        active = self._initial
+        for code in self.classes.translate(word):
+            bits = active & sources[code]
+            move = moves[code]
+            active = 0
+            while bits:
+                low = bits & -bits
+                bits ^= low
+                active |= move[low.bit_length() - 1]
+            if active == 0:
+                return False
+        return active & self._final_bits != 0
+
+    def longest_prefix(self, codes, start: int = 0) -> int:
+        """
+        Recibe una cadena ya traducida a clases (`translate`) y devuelve el
+        mayor `end` tal que el autómata acepta los símbolos de `start` a `end`,
+        o -1 si no acepta ninguno (como `DenseAFD.longest_prefix`). Deja de
+        leer cuando no queda ningún estado activo.
+        """
+        sources, moves, final_bits = self._sources, self._moves, self._final_bits
+        end = -1
+        active = self._initial
+        i = start
+        while active:
+            if active & final_bits:
+                end = i
+            if i == len(codes):
+                return end
+            code = codes[i]
+            bits = active & sources[code]
+            move = moves[code]
+            active = 0
+            while bits:
+                low = bits & -bits
+                bits ^= low
+                active |= move[low.bit_length() - 1]
+            i += 1
+        return end
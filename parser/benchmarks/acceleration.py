@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Compara el tiempo de reconocer cadenas con la tabla densa (`DenseAFD`) con y
+sin estados acelerados: los que vuelven a sí mismos con casi todos los
+caracteres, y cuyos tramos se saltan con `bytes.find`. Se usan las líneas de
+`tests/strings/movidk.txt` (sólo se aceleran las de al menos
+`DenseAFD.ACCELERATION_MIN_LENGTH` caracteres) y el mismo texto partido en
+cadenas de 5000 caracteres.
+
+Acelerar conviene cuando los caracteres con los que se sale son raros
+(.*q.*z.*) y cuesta cuando son frecuentes (los espacios en [a-z]*whale[a-z]*),
+así que sólo se aceleran los estados que salen con pocos caracteres
+(`ACCELERATION_LIMIT`): en las expresiones como [a-z]* no hay estados
+acelerados y los dos tiempos tienen que ser iguales.
+`ACCELERATION_MIN_LENGTH` es el largo a partir del que, en estas mediciones,
+se gana en promedio.
+
+Uso (desde el directorio `parser`):
+    python -m benchmarks.acceleration
+"""
+from os.path import dirname, join
+
+from tabulate import tabulate
+
+from automata import DenseAFD
+from benchmarks.matching import REGEXES as MATCHING, anything, elapsed_ms, whale
+from regex import Char, Concat, Star
+
+REGEXES = {
+    # Se sale de [a-z]* con los espacios y la puntuación, que son frecuentes: no se acelera
+    "[a-z]*whale[a-z]*": MATCHING["[a-z]*whale[a-z]*"],
+    "[a-z]*": MATCHING["[a-z]*"],
+    "[a-z0-9]*(th|sh)[a-z]*": MATCHING["[a-z0-9]*(th|sh)[a-z]*"],
+    # Las 'q' y las 'z' son raras: casi toda la cadena se saltea
+    ".*q.*z.*": Concat(Star(anything), Concat(Char('q'), Concat(Star(anything), Concat(Char('z'), Star(anything))))),
+    # Lo que hace `search`: Σ*·whale·Σ*
+    ".*whale.*": Concat(Star(anything), Concat(whale, Star(anything))),
+}
+
+
+def main():
+    with open(join(dirname(__file__), "..", "tests", "strings", "movidk.txt")) as f:
+        text = f.read()
+    inputs = {
+        "líneas": text.splitlines(),
+        "5000 caracteres": [text[i:i + 5000].replace("\n", "") for i in range(0, len(text), 5000)],
+    }
+
+    table = []
+    for name, regex in REGEXES.items():
+        afd = regex.compile()._AFD
+        accelerated = DenseAFD(afd)
+        limit, DenseAFD.ACCELERATION_LIMIT = DenseAFD.ACCELERATION_LIMIT, 0
+        plain = DenseAFD(afd)
+        DenseAFD.ACCELERATION_LIMIT = limit
+        for input_name, words in inputs.items():
+            accelerated.skipped = 0
+            (plain_time, plain_matches), (accelerated_time, matches) = elapsed_ms([plain, accelerated], words)
+            assert matches == plain_matches
+            total = sum(len(word) for word in words)
+            # `skipped` sumó las `repeat` pasadas
+            table.append([name, input_name, len(accelerated._accelerated), matches, f"{plain_time:.1f}",
+                          f"{accelerated_time:.1f}", f"{100 * accelerated.skipped / 10 / total:.1f}%"])
+    print(tabulate(table, ["regex", "entrada", "estados acelerados", "matches", "sin acelerar ms",
+                           "acelerado ms", "salteado"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Compara el motor bit-paralelo (`BitParallelAFND`, `compile(engine="bitparallel")`)
+con el AFD mínimo compilado en una tabla densa, reconociendo una vez cada
+línea de `tests/strings/movidk.txt` (como una invocación de `tlengrep`):
+el tiempo de compilar, el de reconocer y el total. El AFD reconoce más
+rápido, pero construirlo puede costar mucho más que recorrer la entrada.
+
+Uso (desde el directorio `parser`):
+    python -m benchmarks.bitparallel
+"""
+from os.path import dirname, join
+from time import perf_counter
+
+from tabulate import tabulate
+
+from benchmarks.layouts import union_of, word_regex
+from benchmarks.matching import lower, whale
+from regex import CharClass, Concat, Star, Union
+
+
+def main():
+    with open(join(dirname(__file__), "..", "tests", "strings", "movidk.txt")) as f:
+        lines = f.read().splitlines()
+    words = list(dict.fromkeys(line for line in lines if 0 < len(line) <= 12))
+
+    # La letra que está 10 posiciones antes del final es una vocal: el AFD tiene 2^11 estados
+    ends_with = Concat(Star(lower), CharClass.of("aeiou"))
+    for _ in range(10):
+        ends_with = Concat(ends_with, lower)
+    regexes = {
+        "[a-z]*whale[a-z]*": lambda: Concat(Star(lower), Concat(whale, Star(lower))),
+        "(a|e|i|o|u|[^aeiou])*": lambda: Star(Union(CharClass.of("aeiou"), CharClass.of("aeiou").negate())),
+        "[a-z]*[aeiou][a-z]{10}": lambda: ends_with,
+        "palabra1|...|palabra300": lambda: union_of([word_regex(word) for word in words[:300]]),
+    }
+
+    table = []
+    for name, build in regexes.items():
+        for engine in ["dfa", "bitparallel"]:
+            regex = build()
+            regex.clear_compiled()
+            start = perf_counter()
+            regex.compile(engine=engine, prefilter=False)
+            compile_time = perf_counter() - start
+            start = perf_counter()
+            matches = sum(1 for line in lines if regex.match(line))
+            match_time = perf_counter() - start
+            table.append([name, engine, regex._matcher.size(), matches, f"{compile_time * 1000:.1f}",
+                          f"{match_time * 1000:.1f}", f"{(compile_time + match_time) * 1000:.1f}"])
+    print(tabulate(table, ["regex", "motor", "estados", "matches", "compilar ms", "reconocer ms", "total ms"]))
+
+
+if __name__ == "__main__":
+    main()
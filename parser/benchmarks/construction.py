@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Compara el costo de compilar expresiones regulares según cómo se construye el
+AFD: determinizando el AFND de Thompson o de Glushkov, o con derivadas, y
+trabajando sobre los caracteres o sobre las clases de equivalencia del alfabeto.
+
+Uso (desde el directorio `parser`):
+    python -m benchmarks.construction
+"""
+from functools import reduce
+from time import perf_counter
+
+from tabulate import tabulate
+
+from regex import Char, Concat, Star, Plus, Union
+from regex.derivatives import Derivatives
+
+
+def chars(string: str):
+    return [Char(c) for c in string]
+
+
+def alternation(string: str):
+    return reduce(Union, chars(string))
+
+
+def literal(string: str):
+    return reduce(Concat, chars(string))
+
+
+WORD = "_0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+cases = {
+    "\\w+": Plus(alternation(WORD)),
+    "[a-z]*@[a-z]+": Concat(Star(alternation(WORD[11:37])), Concat(Char("@"), Plus(alternation(WORD[11:37])))),
+    "(\\w\\d)*": Star(Concat(alternation(WORD), alternation(WORD[1:11]))),
+    "chapter[xiv]+": Concat(literal("chapter"), Plus(alternation("xiv"))),
+    "(a|b)*a(a|b){4}": reduce(Concat, [Star(alternation("ab")), Char("a")] + [alternation("ab")] * 4),
+    "((a*)*b)*": Star(Concat(Star(Star(Char("a"))), Char("b"))),
+}
+
+
+def measure(build, repeat: int = 3):
+    """Devuelve el mejor tiempo (en milisegundos) y el resultado de `build`."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        result = build()
+        best = min(best, perf_counter() - start)
+    return best * 1000, result
+
+
+def transitions(afd) -> int:
+    """Cuenta las transiciones (entradas de la tabla) de un autómata."""
+    return sum(len(row) for row in afd.transitions.values())
+
+
+def main():
+    table = []
+    for name, regex in cases.items():
+        for construction in ["thompson", "glushkov", "derivatives"]:
+            for classes in [None, regex.alphabet_classes()]:
+                if construction == "derivatives":
+                    t_afnd, afnd_size = 0, "-"
+                    t_afd, afd = measure(lambda: Derivatives().to_afd(regex, complete=False, classes=classes))
+                else:
+                    t_afnd, afnd = measure(lambda: regex._afnd_for(construction, classes))
+                    t_afd, afd = measure(lambda: afnd.determinize(complete=False))
+                    afnd_size = afnd.size()
+                t_min, min_afd = measure(lambda: afd.minimize())
+                table.append([name, construction, "no" if classes is None else len(classes),
+                              afnd_size, afd.size(), min_afd.size(), transitions(min_afd),
+                              f"{t_afnd:.2f}", f"{t_afd:.2f}", f"{t_min:.2f}",
+                              f"{t_afnd + t_afd + t_min:.2f}"])
+    print(tabulate(table, ["regex", "construcción", "clases", "|AFND|", "|AFD|", "|AFD mín|",
+                           "|δ mín|", "AFND ms", "AFD ms", "minimize ms", "total ms"]))
+
+
+if __name__ == "__main__":
+    main()
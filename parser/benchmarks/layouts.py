@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Compara las formas compiladas del AFD mínimo (`DenseAFD` y `PackedAFD`) en
+memoria (bytes por estado) y en velocidad (millones de caracteres por
+segundo al reconocer las líneas de `tests/strings/movidk.txt`).
+
+Las expresiones son uniones de las primeras n líneas distintas (no vacías)
+del texto, así que el AFD mínimo tiene miles de estados (un trie con sus
+sufijos compartidos) sobre unas 40 clases, y casi todas las transiciones van
+al estado trampa.
+
+Uso (desde el directorio `parser`):
+    python -m benchmarks.layouts
+"""
+from os.path import dirname, join
+from time import perf_counter
+
+from tabulate import tabulate
+
+from automata import DenseAFD, PackedAFD
+from regex import Char, Concat, Union
+
+
+def word_regex(word: str):
+    """Arma la expresión que acepta sólo la palabra dada."""
+    res = Char(word[-1])
+    for char in reversed(word[:-1]):
+        res = Concat(Char(char), res)
+    return res
+
+
+def union_of(regexes: list):
+    """Arma la unión de las expresiones como un árbol balanceado (para no anidar de más)."""
+    if len(regexes) == 1:
+        return regexes[0]
+    middle = len(regexes) // 2
+    return Union(union_of(regexes[:middle]), union_of(regexes[middle:]))
+
+
+def main():
+    with open(join(dirname(__file__), "..", "tests", "strings", "movidk.txt")) as f:
+        lines = f.read().splitlines()
+    distinct = list(dict.fromkeys(line for line in lines if len(line) > 0))
+    chars = sum(len(line) for line in lines)
+
+    table = []
+    for n in [100, 300, 1000]:
+        regex = union_of([word_regex(line) for line in distinct[:n]])
+        afd = regex.compile()._AFD
+        for layout in [DenseAFD, PackedAFD]:
+            matcher = layout(afd)
+            start = perf_counter()
+            matches = sum(matcher.match_string(line) for line in lines)
+            elapsed = perf_counter() - start
+            table.append([n, matcher.size(), matcher.n_classes, layout.__name__, matches,
+                          f"{matcher.nbytes() / matcher.size():.1f}", f"{chars / elapsed / 1e6:.2f}"])
+    print(tabulate(table, ["líneas", "estados", "clases", "forma", "matches", "bytes / estado",
+                           "Mcar / s"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Compara el AFD mínimo con el AFD perezoso (`LazyAFD`, `compile(engine="lazy")`)
+sobre la familia (a|b)*a(a|b){n}, cuyo AFD mínimo tiene 2^(n+1) estados:
+el tiempo de compilar, el de reconocer cadenas al azar (dos veces) y la
+cantidad de estados construidos. El AFD perezoso sólo construye los estados a los que
+llegan las cadenas, y vacía su tabla cuando pasa de `max_states`.
+
+Uso (desde el directorio `parser`):
+    python -m benchmarks.lazy
+"""
+import random
+from time import perf_counter
+
+from tabulate import tabulate
+
+from regex import Char, Concat, Star, Union
+
+
+def nth_from_last(n: int):
+    """Devuelve (a|b)*a(a|b){n}."""
+    ab = Union(Char('a'), Char('b'))
+    regex = Concat(Star(ab), Char('a'))
+    for _ in range(n):
+        regex = Concat(regex, ab)
+    return regex
+
+
+def main():
+    random.seed(0)
+    # Cadenas cortas: cada una visita a lo sumo 2^(n+1) estados, pero en total se repiten
+    words = ["".join(random.choice("ab") for _ in range(random.randint(10, 30))) for _ in range(2000)]
+
+    table = []
+    for n in [4, 8, 12, 14]:
+        for engine, max_states in [("dfa", None), ("lazy", 10000), ("lazy", 256)]:
+            regex = nth_from_last(n)
+            start = perf_counter()
+            regex.compile(engine=engine, max_states=max_states, prefilter=False)
+            compile_time = perf_counter() - start
+            start = perf_counter()
+            matches = sum(1 for word in words if regex.match(word))
+            match_time = perf_counter() - start
+            # Segunda pasada: los estados ya construidos se recorren a velocidad de AFD
+            start = perf_counter()
+            sum(1 for word in words if regex.match(word))
+            hot_time = perf_counter() - start
+            states = regex._AFD.size() if engine == "dfa" else regex._matcher.size()
+            flushes = regex._matcher.flushes if engine == "lazy" else "-"
+            table.append([n, engine if max_states is None else f"{engine} ({max_states})", matches,
+                          f"{compile_time * 1000:.1f}", f"{match_time * 1000:.1f}", f"{hot_time * 1000:.1f}", states, flushes])
+    print(tabulate(table, ["n", "motor", "matches", "compilar ms", "reconocer ms", "de nuevo ms", "estados",
+                           "vaciados"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Compara el tiempo de reconocer las líneas de `tests/strings/movidk.txt`
+recorriendo las transiciones del AFD mínimo (`AFD.match_string`, un
+diccionario de diccionarios) y su forma compilada en una tabla densa
+(`DenseAFD.match_string`). La tabla densa además corta apenas entra en un
+estado muerto o universal. Los dos se miden intercalados y se toma el menor
+de varios tiempos.
+
+Uso (desde el directorio `parser`):
+    python -m benchmarks.matching
+"""
+from os.path import dirname, join
+from time import perf_counter
+
+from tabulate import tabulate
+
+from automata import DenseAFD
+from regex import Char, CharClass, Concat, Star, Union
+
+lower = CharClass([('a', 'z')])
+anything = CharClass().negate()
+whale = Concat(Char('w'), Concat(Char('h'), Concat(Char('a'), Concat(Char('l'), Char('e')))))
+REGEXES = {
+    # Casi todas las líneas se rechazan en el primer carácter
+    "whale[a-z]*": Concat(whale, Star(lower)),
+    # Desde que aparece "whale" se acepta cualquier resto
+    "[a-z]*whale.*": Concat(Star(lower), Concat(whale, Star(anything))),
+    "[a-z]*whale[a-z]*": Concat(Star(lower), Concat(Char('w'), Concat(Char('h'), Concat(
+        Char('a'), Concat(Char('l'), Concat(Char('e'), Star(lower))))))),
+    "[a-z]*": Star(lower),
+    "(a|e|i|o|u|[^aeiou])*": Star(Union(CharClass.of("aeiou"), CharClass.of("aeiou").negate())),
+    "[a-z0-9]*(th|sh)[a-z]*": Concat(Star(CharClass([('a', 'z'), ('0', '9')])),
+                                     Concat(Union(Concat(Char('t'), Char('h')), Concat(Char('s'), Char('h'))),
+                                            Star(lower))),
+}
+
+
+def elapsed_ms(matchers: list, words: list[str], repeat: int = 10) -> list[tuple[float, int]]:
+    """
+    Devuelve, para cada reconocedor, el menor tiempo (de `repeat` veces) de
+    reconocer todas las cadenas y la cantidad de aceptadas. Los
+    reconocedores se miden intercalados, así los cambios de velocidad de la
+    máquina afectan a todos por igual.
+    """
+    best = [None] * len(matchers)
+    counts = [0] * len(matchers)
+    for _ in range(repeat):
+        for i, matcher in enumerate(matchers):
+            start = perf_counter()
+            counts[i] = sum(1 for word in words if matcher.match_string(word))
+            elapsed = perf_counter() - start
+            best[i] = elapsed if best[i] is None else min(best[i], elapsed)
+    return [(elapsed * 1000, count) for elapsed, count in zip(best, counts)]
+
+
+def main():
+    with open(join(dirname(__file__), "..", "tests", "strings", "movidk.txt")) as f:
+        lines = f.read().splitlines()
+
+    table = []
+    for name, regex in REGEXES.items():
+        afd = regex.compile()._AFD
+        (dict_time, dict_matches), (dense_time, dense_matches) = elapsed_ms([afd, DenseAFD(afd)], lines)
+        assert dict_matches == dense_matches
+        table.append([name, dense_matches, f"{dict_time:.1f}", f"{dense_time:.1f}",
+                      f"{dict_time / dense_time:.1f}x"])
+    print(tabulate(table, ["regex", "matches", "dict ms", "densa ms", "aceleración"]))
+
+
+if __name__ == "__main__":
+    main()
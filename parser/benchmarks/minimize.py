@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Mide cómo escala `AFD.minimize` sobre AFDs completos generados al azar, de
+hasta 10^5 estados. Si el algoritmo es O(n·log n), la última columna
+(microsegundos por n·log2(n)) se mantiene aproximadamente constante.
+
+Cada AFD tiene dos copias idénticas de un AFD al azar de n/2 estados, así que
+el AFD mínimo tiene (a lo sumo) la mitad de los estados.
+
+Uso (desde el directorio `parser`):
+    python -m benchmarks.minimize
+"""
+from math import log2
+from random import Random
+from time import perf_counter
+
+from tabulate import tabulate
+
+from automata import AFD
+
+ALPHABET = "ab"
+
+
+def random_afd(n: int, seed: int = 0) -> AFD:
+    """Genera un AFD completo de n estados (n par) formado por dos copias de uno al azar."""
+    rng = Random(seed)
+    half = n // 2
+    targets = [[rng.randrange(half) for _ in ALPHABET] for _ in range(half)]
+    finals = [rng.random() < 0.5 for _ in range(half)]
+
+    M = AFD()
+    for copy in range(2):
+        for q in range(half):
+            M.add_state(copy * half + q, finals[q])
+    for copy in range(2):
+        for q in range(half):
+            for char, target in zip(ALPHABET, targets[q]):
+                # La primera copia salta a la segunda con la primera letra
+                other = 1 - copy if char == ALPHABET[0] else copy
+                M.add_transition(copy * half + q, other * half + target, char)
+    M.mark_initial_state(0)
+    return M
+
+
+def main():
+    table = []
+    for n in [10**3, 3 * 10**3, 10**4, 3 * 10**4, 10**5]:
+        M = random_afd(n)
+        start = perf_counter()
+        minimo = M.minimize()
+        elapsed = perf_counter() - start
+        table.append([n, minimo.size(), f"{elapsed * 1000:.1f}", f"{elapsed * 1e6 / (n * log2(n)):.3f}"])
+    print(tabulate(table, ["|AFD|", "|AFD mín|", "minimize ms", "µs / (n·log2 n)"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Mide cuánto acelera el prefiltro (ver `regex.prefilter`: literales,
+longitudes y caracteres obligatorios) a `RegEx.match` y `RegEx.search` sobre
+las líneas de `tests/strings/movidk.txt`, comparado con recorrer sólo el AFD
+y con buscar el literal obligatorio con `in` (el mejor caso posible).
+
+Uso (desde el directorio `parser`):
+    python -m benchmarks.prefilter
+"""
+from os.path import dirname, join
+from time import perf_counter
+
+from tabulate import tabulate
+
+from benchmarks.matching import lower, whale
+from regex import Char, CharClass, Concat, Star
+from tests.regexes.chapter import __regex__ as chapter
+
+digit = CharClass([('0', '9')])
+REGEXES = {
+    "chapter(x|i|v)+": chapter,
+    "[a-z]*whale[a-z]*": Concat(Star(lower), Concat(whale, Star(lower))),
+    "the[a-z]*": Concat(Char('t'), Concat(Char('h'), Concat(Char('e'), Star(lower)))),
+    # Registro de formato fijo: sin literales, pero las líneas se descartan por su longitud
+    "[0-9]{4}": Concat(digit, Concat(digit, Concat(digit, digit))),
+}
+
+
+def elapsed_ms(f, lines: list[str]) -> tuple[float, int]:
+    """Devuelve el tiempo de aplicar f a todas las líneas y la cantidad de aceptadas."""
+    start = perf_counter()
+    count = sum(1 for line in lines if f(line))
+    return (perf_counter() - start) * 1000, count
+
+
+def main():
+    with open(join(dirname(__file__), "..", "tests", "strings", "movidk.txt")) as f:
+        lines = f.read().splitlines()
+
+    table = []
+    for name, regex in REGEXES.items():
+        for mode in ["match", "search"]:
+            required = regex.compile(prefilter=True).prefilter().required
+            getattr(regex, mode)("")
+            raw, _ = elapsed_ms(lambda line: required in line, lines)
+            with_prefilter, matches = elapsed_ms(getattr(regex.compile(prefilter=True), mode), lines)
+            without_prefilter, _ = elapsed_ms(getattr(regex.compile(prefilter=False), mode), lines)
+            table.append([name, mode, repr(required), matches, f"{raw:.1f}", f"{with_prefilter:.1f}",
+                          f"{without_prefilter:.1f}"])
+    print(tabulate(table, ["regex", "modo", "literal", "matches", "`in` ms", "con prefiltro ms",
+                           "sin prefiltro ms"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,16 @@
 import sys
 
-from regex import RegEx, Lambda, Union, Char, Concat, Star, Plus, Empty
+from regex import RegEx, Lambda, Union, Char, CharClass, Concat, Star, Plus, Empty
 from .errors import SyntaxError
 
 #lo agregamos nosotros
 from .ply.yacc import yacc
 from .ply.lex import lex
 
-def numeritos():
-    temp = Char("0")
-    for i in range(1,10):
-        temp = Union(temp, Char(str(i)))
-    return temp
-
-def letras(inicio, fin):
-    res = Char(inicio)
-    for c in range(ord(inicio)+1, ord(fin)+1):
-        letra = Char(chr(c))
-        res = Union(res, letra)
-    return res
-
-num1 = numeritos()
-abc1 = letras('a', 'z')
-abc2 = letras('A', 'Z')    #dejamos precalculado [a-z], [A-Z], y [0-9]
+# Intervalos de \d y \w: cada aparición arma su propia CharClass, porque la
+# expresión guarda su estado de compilación (motor, prefiltro, AFD)
+num1 = [('0', '9')]
+palabra = [('0', '9'), ('a', 'z'), ('A', 'Z'), ('_', '_')]
 
 # simRes = {"+", "?", "\\", "(",")", "[", "]", "|"}
 
@@ -243,17 +231,13 @@ def p_chars_d(p):
     '''
     chars : DE
     '''
-    p[0] = num1
+    p[0] = CharClass(num1)
 
 def p_chars_w(p):
     '''
     chars : DOBLEV
     '''
-    tempNum = num1
-    temp_az = abc1
-    temp_az_mayus = abc2
-
-    p[0] = Union(Char("_"), Union(tempNum, Union(temp_az, temp_az_mayus)))
+    p[0] = CharClass(palabra)
     
 
 # C -> V
@@ -279,7 +263,7 @@ def p_chars_cora_tguion(p):
     ''' 
     p[0] = p[2][2]
     if (p[2][3]):
-        p[0] = Union(Char("-"),p[0])   
+        p[0] = CharClass.of("-").union(p[0])
   
     
 
@@ -290,14 +274,14 @@ def p_unboxing_fin(p):
     '''
     # establezco info en p[0] = (ultimoValorEnRegEx, loAnteUltimo, RegEx, fueGuion) que se utilizará en la recursion
     print(p[1])
-    p[0] = (p[1][0], "CORC", p[1][1], False) #(1, 'CORC', Char("1"))
+    p[0] = (p[1][0], "CORC", CharClass.of(str(p[1][0])), False) #(1, 'CORC', CharClass.of("1"))
 
 # U -> V U 
 def p_unboxing_recursion(p):
     '''
     unboxing : valor unboxing
     '''
-    #En p[1] tengo el valor que quiero unir al RegEx* y en p[2] tengo la tripla que me dice (loUltimoPuesto, loAnteultimo, RegEx)
+    #En p[1] tengo el valor que quiero unir a la CharClass y en p[2] tengo la tripla que me dice (loUltimoPuesto, loAnteultimo, CharClass)
     aUnir = p[1]
     loUltimoPuesto = p[2][0]
     loAnteUltimoPuesto = p[2][1]
@@ -316,19 +300,15 @@ def p_unboxing_recursion(p):
             fin = str(loAnteUltimoPuesto)
         
         if(ord(inicio) <= ord(fin)): #solo voy a hacerlo si es posible recorrer los ascii
-            res = Char(inicio)
+            rango = CharClass([(inicio, fin)]) #el ultimo elemento ya estaba en la CharClass, pero unirlo de nuevo no cambia nada
 
-            for c in range(ord(inicio)+1, ord(fin)): #el rango va SIN el ultimo elemento, porque en los otros pasos si NO soy un rango, ya agregue el valor al RegEx
-                letra = Char(chr(c))
-                res = Union(res, letra)
-            
-            p[0] = (aUnir[0], loUltimoPuesto, Union(res ,ultimoRegex), False)
+            p[0] = (aUnir[0], loUltimoPuesto, rango.union(ultimoRegex), False)
         else: #si no se puede, error
             raise SyntaxError
     elif (aUnir[0] == "-"): # si el valAUnir es "-", activo el bit de fueGuion
         p[0] = (aUnir[0], loUltimoPuesto, ultimoRegex, True) #y a su vez salva el caso de iniciar con "-"
-    else: # si no quiero hacer rango, y NO fui un guion, entonces quiero que el nuevo RegEx sea Union(RegEx_anterior, aUnir[1])
-        p[0] = (aUnir[0], loUltimoPuesto, Union(aUnir[1] ,ultimoRegex), False)
+    else: # si no quiero hacer rango, y NO fui un guion, entonces quiero que la nueva CharClass sea la union de la anterior con aUnir
+        p[0] = (aUnir[0], loUltimoPuesto, CharClass.of(str(aUnir[0])).union(ultimoRegex), False)
  
     
 
@@ -1,13 +1,22 @@
+import sys
 from abc import ABC, abstractmethod
+from os.path import commonprefix
+from typing import TYPE_CHECKING, Iterable, Iterator
 
-from automata import AFND
+from automata import (AFD, AFND, AFNDSimulation, AlphabetClasses, BitParallelAFND, Budget, BudgetExceeded, DenseAFD,
+                      LazyAFD, PackedAFD, StateLimitExceeded)
 from automata.afnd import SpecialSymbol
 
+if TYPE_CHECKING:
+    # regex.prefilter importa este módulo
+    from regex.prefilter import Prefilter
+
 __all__ = [
     "RegEx",
     "Empty",
     "Lambda",
     "Char",
+    "CharClass",
     "Union",
     "Concat",
     "Star",
@@ -15,30 +24,517 @@ __all__ = [
 ]
 
 class RegEx(ABC):
-    """Clase abstracta para representar expresiones regulares."""
-    
-    def __init__(self):
-        self._AFD = self.to_afnd().determinize().minimize()
-        
-    
+    """
+    Clase abstracta para representar expresiones regulares.
+
+    El AFD mínimo se construye recién cuando hace falta (primer llamado a
+    `match` o llamado explícito a `compile`), así construir un árbol cuesta
+    tiempo lineal en su tamaño y sólo la raíz guarda un autómata. Para
+    reconocer cadenas se usa una forma compilada del AFD mínimo (ver `LAYOUTS`).
+    """
+
+    _AFD = None
+    _matcher = None
+    _search = None
+    _spans = None
+    # None si todavía no se calculó, False si está desactivado
+    _prefilter = None
+    # True si la expresión es sobre bytes (ver `to_utf8`)
+    _binary = False
+
+    # Formas compiladas del AFD mínimo que se pueden elegir en `compile`
+    LAYOUTS = {"dense": DenseAFD, "packed": PackedAFD}
+    # Motores de `match` que se pueden elegir en `compile`
+    ENGINES = ("dfa", "lazy", "nfa", "bitparallel")
+    _engine = "dfa"
+    _max_states = 100000
+    _budget = None
+    _fallback = None
+
+    def compile(self, construction: str = None, layout: str = None, prefilter: bool = None,
+                engine: str = None, max_states: int = None, budget: Budget = None,
+                fallback: str = None) -> "RegEx":
+        """
+        Construye (si todavía no existe) el AFD mínimo de la expresión regular.
+        Devuelve la misma expresión regular para poder encadenar llamados.
+
+        `construction` elige cómo se construye el AFD antes de minimizarlo:
+        determinizando el AFND de "thompson" (`to_afnd`, la opción por
+        defecto) o de "glushkov" (`to_position_automaton`), o directamente con
+        "derivatives" (derivadas de Brzozowski, ver `regex.derivatives`). Los
+        motores "lazy" y "nfa" usan el AFND pedido, y el de Thompson con
+        "derivatives" (que no arma un AFND). El motor "bitparallel" sólo
+        admite "glushkov".
+
+        `layout` elige la forma compilada del AFD mínimo que usa `match`: una
+        tabla "dense" (`DenseAFD`, la opción por defecto) o una tabla
+        comprimida "packed" (`PackedAFD`), que ocupa menos memoria cuando el
+        AFD tiene muchos estados y pocas transiciones por estado. Si se pide
+        otra forma que la que ya existe, se recompila sólo la tabla. Sólo se
+        admite con el motor "dfa".
+
+        `prefilter` activa o desactiva el prefiltro (ver `prefilter`) que usan
+        `match` y `search`. Por defecto está activado.
+
+        `engine` elige el motor de `match` y `search`:
+        - "dfa" (la opción por defecto) construye el AFD mínimo entero de
+          antemano. Si el AFD pasa de `max_states` estados, se deja de
+          construir y se usa "nfa".
+        - "lazy" guarda sólo el AFND y construye los estados del AFD a medida
+          que las cadenas llegan a ellos (`LazyAFD`), con a lo sumo
+          `max_states` estados a la vez.
+        - "nfa" simula el AFND sin determinizarlo (`AFNDSimulation`), en
+          tiempo lineal en el largo de la cadena por el tamaño del AFND.
+        - "bitparallel" simula el autómata de posiciones con operaciones de
+          bits (`BitParallelAFND`). Construirlo
+          es casi gratis, así que conviene cuando se reconocen pocas cadenas
+          con una expresión grande.
+        Los tres últimos convienen cuando el AFD es exponencialmente más
+        grande que el AFND. `max_states` es 100000 si no se indica. El motor
+        elegido queda para los próximos llamados.
+
+        `budget` limita lo que se puede gastar en construir los autómatas
+        (ver `Budget`; el tiempo se cuenta de nuevo para cada motor). Si se
+        pasa de algún límite, se lanza `BudgetExceeded`, salvo que se indique
+        `fallback`: "lazy" o "nfa", el motor que se usa si no se puede
+        construir el AFD (los dos necesitan sólo el AFND, así que un límite
+        de estados del AFND no tiene alternativa). Con "lazy", el AFD
+        perezoso guarda a lo sumo los estados del AFD que permite el
+        presupuesto. Como el motor, quedan para los próximos llamados.
+        """
+        if engine is not None and engine not in self.ENGINES:
+            raise ValueError(f"El motor {engine} no existe.")
+        if fallback is not None and fallback not in ("lazy", "nfa"):
+            raise ValueError(f"No se puede pasar al motor {fallback}.")
+        options = (engine or self._engine, max_states or self._max_states, budget or self._budget,
+                   fallback or self._fallback)
+        if layout is not None and options[0] != "dfa":
+            raise ValueError(f"El motor {options[0]} no usa una forma compilada del AFD.")
+        if construction is not None and options[0] == "bitparallel" and construction != "glushkov":
+            raise ValueError("El motor bitparallel usa el autómata de posiciones (construcción glushkov).")
+        if options != (self._engine, self._max_states, self._budget, self._fallback):
+            self._engine, self._max_states, self._budget, self._fallback = options
+            self._matcher = None
+            self._search = None
+            self._spans = None
+        if prefilter is False:
+            self._prefilter = False
+        elif prefilter and self._prefilter is False:
+            self._prefilter = None
+        if layout is not None and layout not in self.LAYOUTS:
+            raise ValueError(f"La forma compilada {layout} no existe.")
+        construction = construction or "thompson"
+        budget = self._budget.start() if self._budget is not None else None
+        if self._engine == "lazy":
+            if self._matcher is None:
+                classes = self.alphabet_classes()
+                self._matcher = LazyAFD(self._afnd_for(construction, classes, budget), self._lazy_states(classes))
+            return self
+        if self._engine == "nfa":
+            if self._matcher is None:
+                self._matcher = AFNDSimulation(self._afnd_for(construction, self.alphabet_classes(), budget))
+            return self
+        if self._engine == "bitparallel":
+            if self._matcher is None:
+                self._matcher = BitParallelAFND(self.to_position_automaton(self.alphabet_classes(), budget))
+            return self
+        if self._AFD is None:
+            try:
+                afd = self._afd_for(construction, self.alphabet_classes(), self._max_states, budget)
+                self._AFD = afd.minimize(budget)
+            except StateLimitExceeded:
+                return self.compile(construction, engine="nfa")
+            except BudgetExceeded as e:
+                if self._fallback is None or e.resource == "nfa_states":
+                    raise
+                return self.compile(construction, engine=self._fallback)
+        if self._matcher is None or (layout is not None and type(self._matcher) is not self.LAYOUTS[layout]):
+            self._matcher = self.LAYOUTS[layout or "dense"](self._AFD)
+        return self
+
+    def is_compiled(self) -> bool:
+        """
+        Indica si la expresión regular ya tiene construido el reconocedor del
+        motor elegido (el AFD mínimo con "dfa").
+        """
+        return self._matcher is not None
+
+    def clear_compiled(self):
+        """Descarta los AFDs construidos (el de `match`, el de `search` y los de `finditer`), liberando la memoria que ocupan."""
+        self._AFD = None
+        self._matcher = None
+        self._search = None
+        self._spans = None
 
-    @abstractmethod
     def naive_match(self, word: str) -> bool:
         """
         Indica si la expresión regular acepta la cadena dada.
-        Implementación recursiva, poco eficiente.
+
+        Implementación de referencia, recursiva sobre el árbol y sin
+        autómatas (sirve para verificarlos): calcula con `_naive_ends` las
+        posiciones en las que puede terminar una subcadena aceptada que
+        empieza en 0. Cada nodo se evalúa a lo sumo una vez por posición de
+        inicio, y cada evaluación junta (en Concat y en las clausuras) los
+        bitsets de hasta n + 1 posiciones de fin, de n bits cada uno. Así el
+        costo es O(n³/w · |R|), con w los bits de una palabra de la máquina,
+        aun con clausuras anidadas.
         """
-        pass
+        return self._naive_ends(word, 0, {}) >> len(word) & 1 == 1
 
     def match(self, word: str) -> bool:
-        """Indica si la expresión regular acepta la cadena dada."""   
-        miAFD = self._AFD
-        return miAFD.match_string(word)
+        """Indica si la expresión regular acepta la cadena dada."""
+        prefilter = self._prefilter if self._prefilter is not None else self.prefilter()
+        if prefilter and not prefilter.check(word):
+            return False
+        return self.compile()._matcher.match_string(word)
+
+    def prefilter(self) -> "Prefilter":
+        """
+        Devuelve el prefiltro de la expresión (ver `regex.prefilter`): los
+        literales que tiene que contener toda cadena aceptada, que `match` y
+        `search` buscan con `str.startswith`, `str.endswith` e `in` antes de
+        recorrer el AFD. Devuelve None si el prefiltro está desactivado.
+        """
+        if self._prefilter is None:
+            from regex.prefilter import Prefilter
+            self._prefilter = Prefilter(self)
+        return self._prefilter or None
+
+    def naive_search(self, word: str) -> bool:
+        """
+        Indica si la expresión regular acepta alguna subcadena de la cadena
+        dada. Implementación naive: prueba cada posición de inicio con
+        `_naive_ends`, compartiendo lo ya calculado.
+        """
+        memo = {}
+        return any(self._naive_ends(word, i, memo) != 0 for i in range(len(word) + 1))
+
+    def _naive_ends(self, word: str, start: int, memo: dict) -> int:
+        """
+        (Interno) Devuelve un bitset con las posiciones j tales que la
+        expresión acepta word[start:j]. Los resultados se guardan en `memo`
+        por (nodo, start), así no se recalculan.
+        """
+        key = (id(self), start)
+        if key not in memo:
+            memo[key] = self._match_ends(word, start, memo)
+        return memo[key]
+
+    def _naive_repeat(self, word: str, ends: int, memo: dict) -> int:
+        """
+        (Interno) Devuelve las posiciones de `ends` más aquellas a las que se
+        llega desde ellas repitiendo la expresión una o más veces.
+        """
+        res = ends
+        pending = ends
+        while pending:
+            low = pending & -pending
+            pending ^= low
+            new = self._naive_ends(word, low.bit_length() - 1, memo) & ~res
+            res |= new
+            pending |= new
+        return res
+
+    def search(self, word: str) -> bool:
+        """
+        Indica si la expresión regular acepta alguna subcadena de la cadena
+        dada (como grep).
+
+        Usa el AFD mínimo de Σ*·R·Σ* (que se construye la primera vez, como
+        el de `match` y con el mismo motor): al leer una ocurrencia de R se
+        llega a un estado universal y el reconocedor termina en ese momento,
+        sin volver a probar otras posiciones de inicio (el AFD perezoso, en
+        cambio, lee la cadena entera). Antes, el prefiltro descarta las
+        cadenas que no contienen los literales obligatorios de R.
+        """
+        if self._search is None:
+            anything = Star(CharClass().negate())
+            self._search = Concat(anything, Concat(self, anything)).compile(
+                prefilter=False, engine=self._engine, max_states=self._max_states, budget=self._budget,
+                fallback=self._fallback)
+        prefilter = self._prefilter if self._prefilter is not None else self.prefilter()
+        if prefilter and not prefilter.check_search(word):
+            return False
+        return self._search.match(word)
+
+    def finditer(self, line: str) -> Iterator[tuple[int, int]]:
+        """
+        Devuelve los pares (inicio, fin) de las ocurrencias de la expresión
+        en la línea, de izquierda a derecha y sin superponerse: cada una es
+        la que empieza más a la izquierda y, entre ésas, la más larga. Como en
+        `re.finditer`, también se devuelven las ocurrencias vacías.
+
+        Como en RE2, usa dos AFDs mínimos. El de la expresión reversa de R·Σ*
+        (que se arma dando vuelta el AFND de Thompson) se corre una vez hacia
+        atrás sobre toda la línea y marca las posiciones en las que empieza
+        alguna ocurrencia. Desde la primera de ellas se corre el AFD de R
+        hacia adelante hasta encontrar el fin más lejano.
+
+        La pasada hacia atrás es lineal, pero cada pasada hacia adelante lee
+        hasta que el AFD de R entra en un estado muerto, que puede estar más
+        allá del fin de la ocurrencia: en el peor caso (por ejemplo a|a*b sobre
+        aaa...a) el tiempo total es cuadrático en el largo de la línea.
+
+        Los dos AFDs se construyen con el mismo `max_states` y presupuesto que
+        el de `match` (ver `compile`). Si el motor no es "dfa", o si alguno de
+        los AFDs pasa de `max_states` (o del presupuesto, con `fallback`), no
+        se construyen: cada ocurrencia se busca corriendo el AFND de R (con el
+        motor "nfa", o el AFD perezoso con "lazy") hacia adelante desde cada
+        posición de inicio, en tiempo cuadrático en el largo de la línea. Si
+        se pasa del presupuesto sin `fallback`, se lanza `BudgetExceeded`.
+        """
+        if self._spans is None:
+            self._spans = self._span_matchers()
+        forward, reverse = self._spans
+        prefilter = self.prefilter()
+        if prefilter is not None and not prefilter.check_search(line):
+            return
+
+        codes = forward.translate(line)
+        if reverse is not None:
+            # starts[i] es 1 si alguna ocurrencia empieza en la posición i
+            starts = reverse.prefix_ends(reverse.translate(line[::-1]))[::-1]
+        pos = 0
+        while pos <= len(line):
+            if reverse is not None:
+                start = starts.find(1, pos)
+                if start == -1:
+                    return
+                end = forward.longest_prefix(codes, start)
+            else:
+                # Sin el AFD reverso se prueba cada posición de inicio
+                start, end = pos, forward.longest_prefix(codes, pos)
+                while end == -1 and start < len(line):
+                    start += 1
+                    end = forward.longest_prefix(codes, start)
+                if end == -1:
+                    return
+            yield start, end
+            pos = end if end > start else end + 1
+
+    def _span_matchers(self) -> tuple:
+        """
+        (Interno) Construye los reconocedores de `finditer`: el AFD de R y el
+        de la reversa de R·Σ* (los dos como `DenseAFD`), o un reconocedor del
+        AFND de R con el motor de la expresión y None si no se usan AFDs.
+        """
+        engine = self._engine
+        if engine == "dfa":
+            budget = self._budget.start() if self._budget is not None else None
+            try:
+                forward = self._AFD
+                if forward is None:
+                    forward = self._afd_for("thompson", self.alphabet_classes(), self._max_states, budget)
+                    forward = forward.minimize(budget)
+                anything = Star(CharClass().negate())
+                suffixed = Concat(self, anything)
+                reverse = suffixed.to_afnd(suffixed.alphabet_classes(), budget).reverse()
+                reverse = reverse.determinize(complete=False, max_states=self._max_states, budget=budget)
+                return DenseAFD(forward), DenseAFD(reverse.minimize(budget))
+            except StateLimitExceeded:
+                engine = "nfa"
+            except BudgetExceeded as e:
+                if self._fallback is None or e.resource == "nfa_states":
+                    raise
+                engine = self._fallback
+        budget = self._budget.start() if self._budget is not None else None
+        classes = self.alphabet_classes()
+        afnd = self.to_afnd(classes, budget)
+        if engine == "lazy":
+            return LazyAFD(afnd, self._lazy_states(classes)), None
+        # Con "bitparallel" también se simula el AFND de Thompson
+        return AFNDSimulation(afnd), None
+
+    def to_utf8(self) -> "RegEx":
+        """
+        Devuelve la expresión equivalente sobre bytes (ver `regex.utf8`): los
+        caracteres que no son ASCII y las clases de caracteres se reemplazan
+        por sus codificaciones en UTF-8. Su AFD tiene a lo sumo 256 símbolos,
+        y `match`, `search` y `finditer` reciben `bytes` (la codificación en
+        UTF-8 de las cadenas) sin decodificarlos; los bytes que no son UTF-8
+        válido simplemente no son aceptados por ninguna clase.
+        """
+        from regex.utf8 import to_utf8
+        res = to_utf8(self)
+        res._binary = True
+        return res
+
+    def to_afnd(self, classes: AlphabetClasses = None, budget: Budget = None) -> AFND:
+        """
+        Convierte la expresión regular a un AFND (construcción de Thompson).
+
+        Cada subexpresión se construye una única vez como un fragmento con un
+        estado inicial y uno final, y los estados son enteros consecutivos, así
+        que el costo es lineal en la cantidad de nodos del árbol. Las
+        transiciones usan los ids de las clases del alfabeto (una por clase,
+        así una clase negada no se recorre carácter por carácter): las
+        indicadas o, si no se indican, las de la expresión
+        (`alphabet_classes`). Si se indica un presupuesto (`Budget`), se
+        verifica cada vez que se agrega un estado.
+        """
+        if classes is None:
+            classes = self.alphabet_classes()
+        M = AFND()
+        M.classes = classes
+        M.budget = budget
+        initial, final = self._build_afnd(M, classes)
+        M.budget = None
+        M.mark_initial_state(initial)
+        M.final_states.add(final)
+        return M
+
+    def to_position_automaton(self, classes: AlphabetClasses = None, budget: Budget = None) -> AFND:
+        """
+        Convierte la expresión regular a su autómata de posiciones (Glushkov).
+
+        El AFND resultante no tiene transiciones lambda: tiene un estado
+        inicial (0) y un estado por cada aparición de un carácter (o de una
+        clase de caracteres) en la expresión, y se arma a partir de los
+        conjuntos nullable, first, last y follow calculados sobre el árbol.
+        Como en `to_afnd`, las transiciones usan las clases del alfabeto. Si
+        se indica un presupuesto (`Budget`), se verifica antes de armarlo.
+        """
+        if classes is None:
+            classes = self.alphabet_classes()
+        labels = [None]
+        follow = [set()]
+        nullable, first, last = self._positions(labels, follow)
+        if budget is not None:
+            budget.check_nfa(len(labels), len(first) + sum(len(targets) for targets in follow))
+        symbols = [None] + [leaf._symbols(classes) for leaf in labels[1:]]
+
+        M = AFND()
+        M.classes = classes
+        M.add_state(0, nullable)
+        M.mark_initial_state(0)
+        for p in range(1, len(labels)):
+            M.add_state(p, p in last)
+        for q in first:
+            for symbol in symbols[q]:
+                M.add_transition(0, q, symbol)
+        for p in range(1, len(labels)):
+            for q in follow[p]:
+                for symbol in symbols[q]:
+                    M.add_transition(p, q, symbol)
+        return M
+
+    def alphabet_classes(self) -> AlphabetClasses:
+        """
+        Calcula las clases de equivalencia del alfabeto de la expresión: cada
+        carácter suelto, cada clase de caracteres y cada unión que sólo tiene
+        caracteres es un conjunto, y los caracteres que pertenecen a los mismos
+        conjuntos (por ejemplo, todos los de [a-z]) son indistinguibles.
+        """
+        return AlphabetClasses(chars.intervals for chars in self._alphabet_sets())
+
+    def _alphabet_sets(self) -> list["CharClass"]:
+        """(Interno) Devuelve los conjuntos de caracteres de los que salen las clases del alfabeto."""
+        sets = []
+        chars = self._char_set(sets)
+        if chars is not None:
+            sets.append(chars)
+        return sets
+
+    def _afd_for(self, construction: str, classes: AlphabetClasses = None, max_states: int = None,
+                 budget: Budget = None) -> AFD:
+        """
+        (Interno) Construye el AFD (parcial y sin minimizar) de la expresión
+        con la construcción pedida, sobre las clases del alfabeto si se
+        indican. Lanza `StateLimitExceeded` si pasa de `max_states` estados,
+        y `BudgetExceeded` si pasa del presupuesto.
+        """
+        if construction == "derivatives":
+            from regex.derivatives import Derivatives
+            return Derivatives().to_afd(self, complete=False, classes=classes, max_states=max_states, budget=budget)
+        return self._afnd_for(construction, classes, budget).determinize(complete=False, max_states=max_states,
+                                                                          budget=budget)
+
+    def _afnd_for(self, construction: str, classes: AlphabetClasses = None, budget: Budget = None) -> AFND:
+        """
+        (Interno) Construye el AFND de la expresión con la construcción
+        pedida. Las derivadas construyen directamente el AFD, así que para
+        ellas (por ejemplo, con los motores "lazy" y "nfa") se usa el AFND de
+        Thompson.
+        """
+        if construction in ("thompson", "derivatives"):
+            return self.to_afnd(classes, budget)
+        if construction == "glushkov":
+            return self.to_position_automaton(classes, budget)
+        raise ValueError(f"La construcción {construction} no existe.")
+
+    def _lazy_states(self, classes: AlphabetClasses) -> int:
+        """(Interno) Devuelve cuántos estados puede guardar el AFD perezoso según `max_states` y el presupuesto."""
+        res = self._max_states
+        if self._budget is not None and self._budget.dfa_states is not None:
+            res = min(res, self._budget.dfa_states)
+        if self._budget is not None and self._budget.memory is not None:
+            # Cada estado ocupa una fila de la tabla (ver `LazyAFD.nbytes`)
+            res = min(res, self._budget.memory // (8 * len(classes) + 1))
+        return max(res, 3)
+
+    @abstractmethod
+    def _match_ends(self, word: str, start: int, memo: dict) -> int:
+        """
+        (Interno) Calcula lo que devuelve `_naive_ends` (usando `_naive_ends`
+        para las subexpresiones).
+        """
+        pass
+
+    @abstractmethod
+    def _char_set(self, sets: list["CharClass"]) -> "CharClass":
+        """
+        (Interno) Si la expresión es una unión de caracteres devuelve la clase
+        con esos caracteres. Si no, agrega a `sets` las clases maximales de sus
+        subexpresiones y devuelve None.
+        """
+        pass
+
+    @abstractmethod
+    def _positions(self, labels: list, follow: list[set]) -> tuple[bool, set, set]:
+        """
+        (Interno) Numera las apariciones de caracteres o clases de caracteres
+        de la expresión (agregando la hoja a `labels` y su conjunto follow a
+        `follow`), completa los follow de sus posiciones y devuelve
+        (nullable, first, last).
+        """
+        pass
+
+    @abstractmethod
+    def _build_afnd(self, M: AFND, classes: AlphabetClasses) -> tuple[int, int]:
+        """
+        (Interno) Agrega a M el fragmento de Thompson de la expresión regular
+        (sobre las clases del alfabeto dadas) y devuelve sus estados
+        inicial y final.
+        """
+        pass
+
+    @abstractmethod
+    def _literals(self) -> tuple:
+        """
+        (Interno) Devuelve (exact, prefix, suffix, factor): la única cadena
+        que acepta la expresión (o None si acepta otras o ninguna), un
+        prefijo y un sufijo de todas las cadenas que acepta, y una subcadena
+        de todas ellas (la más larga que se encuentre). Si la expresión no
+        acepta ninguna cadena devuelve None.
+        """
+        pass
+
+    @abstractmethod
+    def _length_bounds(self) -> tuple[int, int]:
+        """
+        (Interno) Devuelve (min, max): las longitudes mínima y máxima de las
+        cadenas que acepta la expresión (max es None si no hay máximo), o None
+        si la expresión no acepta ninguna cadena.
+        """
+        pass
 
     @abstractmethod
-    def to_afnd(self) -> AFND:
-        """Convierte la expresión regular a un AFND."""
-        pass 
+    def _required_chars(self) -> frozenset:
+        """
+        (Interno) Devuelve el conjunto de caracteres que aparecen en todas las
+        cadenas que acepta la expresión, o None si no acepta ninguna cadena.
+        """
+        pass
 
     @abstractmethod
     def _atomic(self) -> bool:
@@ -51,17 +547,26 @@ class RegEx(ABC):
 
 class Empty(RegEx):
     """Expresión regular que denota el lenguaje vacío (∅)."""
-    def __init__(self):
-         self._AFD = self.to_afnd().determinize().minimize()
-    def naive_match(self, word: str):
-        return False
+    def _match_ends(self, word: str, start: int, memo: dict) -> int:
+        return 0
 
-    def to_afnd(self) -> AFND:
-        M = AFND()
-        M.add_state("q0", False)
-        M.mark_initial_state("q0")
-        M.add_state("q1", True)
-        return M
+    def _build_afnd(self, M: AFND, classes: AlphabetClasses) -> tuple[int, int]:
+        return M.new_state(), M.new_state()
+
+    def _char_set(self, sets: list["CharClass"]) -> "CharClass":
+        return CharClass()
+
+    def _positions(self, labels: list, follow: list[set]) -> tuple[bool, set, set]:
+        return False, set(), set()
+
+    def _literals(self) -> tuple:
+        return None
+
+    def _length_bounds(self) -> tuple[int, int]:
+        return None
+
+    def _required_chars(self) -> frozenset:
+        return None
 
     def _atomic(self):
         return True
@@ -72,16 +577,28 @@ class Empty(RegEx):
 
 class Lambda(RegEx):
     """Expresión regular que denota el lenguaje de la cadena vacía (Λ)."""
-    def __init__(self):
-         self._AFD = self.to_afnd().determinize().minimize()
-    def naive_match(self, word: str):
-        return word == ""
-    
-    def to_afnd(self) -> AFND:
-        M = AFND()
-        M.add_state("q0", True)
-        M.mark_initial_state("q0")
-        return M
+    def _match_ends(self, word: str, start: int, memo: dict) -> int:
+        return 1 << start
+
+    def _build_afnd(self, M: AFND, classes: AlphabetClasses) -> tuple[int, int]:
+        q0, q1 = M.new_state(), M.new_state()
+        M.add_transition(q0, q1, SpecialSymbol.Lambda)
+        return q0, q1
+
+    def _char_set(self, sets: list["CharClass"]) -> "CharClass":
+        return None
+
+    def _positions(self, labels: list, follow: list[set]) -> tuple[bool, set, set]:
+        return True, set(), set()
+
+    def _literals(self) -> tuple:
+        return "", "", "", ""
+
+    def _length_bounds(self) -> tuple[int, int]:
+        return 0, 0
+
+    def _required_chars(self) -> frozenset:
+        return frozenset()
 
     def _atomic(self):
         return True
@@ -96,22 +613,37 @@ class Char(RegEx):
     def __init__(self, char: str):
         assert len(char) == 1
         self.char = char
-        self._AFD = self.to_afnd().determinize().minimize()
 
-    def naive_match(self, word: str):
-        return word == self.char
+    def _match_ends(self, word: str, start: int, memo: dict) -> int:
+        return 1 << (start + 1) if word[start:start + 1] == self.char else 0
 
-    def to_afnd(self) -> AFND:
-        M = AFND()
-        M.alphabet = set(self.char)
-        M.add_state("q0", False)
-        M.add_state("q1", True)
-        M.mark_initial_state("q0")
-        M.add_transition("q0","q1",self.char)
+    def _build_afnd(self, M: AFND, classes: AlphabetClasses) -> tuple[int, int]:
+        q0, q1 = M.new_state(), M.new_state()
+        for symbol in self._symbols(classes):
+            M.add_transition(q0, q1, symbol)
+        return q0, q1
 
-        M.normalize_states()
-        return M
+    def _symbols(self, classes: AlphabetClasses) -> list:
+        """(Interno) Devuelve los símbolos de la transición del carácter."""
+        return [classes.lookup(self.char)]
+
+    def _char_set(self, sets: list["CharClass"]) -> "CharClass":
+        return CharClass.of(self.char)
 
+    def _positions(self, labels: list, follow: list[set]) -> tuple[bool, set, set]:
+        p = len(labels)
+        labels.append(self)
+        follow.append(set())
+        return False, {p}, {p}
+
+    def _literals(self) -> tuple:
+        return self.char, self.char, self.char, self.char
+
+    def _length_bounds(self) -> tuple[int, int]:
+        return 1, 1
+
+    def _required_chars(self) -> frozenset:
+        return frozenset(self.char)
 
     def _atomic(self):
         return True
@@ -120,44 +652,207 @@ class Char(RegEx):
         return self.char
 
 
-class Concat(RegEx):
-    """Expresión regular que denota la concatenación de dos expresiones regulares."""
+class CharClass(RegEx):
+    """
+    Expresión regular que denota el lenguaje de los caracteres de un conjunto
+    (por ejemplo [a-z0-9]), guardado como una lista ordenada de intervalos
+    disjuntos de códigos.
+    """
+
+    MAX_CODE = sys.maxunicode
+
+    def __init__(self, ranges: Iterable[tuple[str, str]] = ()):
+        """Construye la clase con los rangos (inclusivos) de caracteres dados."""
+        self.intervals = CharClass._normalize([(ord(lo), ord(hi)) for lo, hi in ranges])
+
+    @classmethod
+    def of(cls, chars: str) -> "CharClass":
+        """Construye la clase con los caracteres dados."""
+        return cls._from_intervals((ord(c), ord(c)) for c in chars)
+
+    @classmethod
+    def _from_intervals(cls, intervals: Iterable[tuple[int, int]]) -> "CharClass":
+        """(Interno) Construye la clase a partir de intervalos de códigos."""
+        res = cls()
+        res.intervals = CharClass._normalize(intervals)
+        return res
+
+    def union(self, other: "CharClass") -> "CharClass":
+        """Devuelve la clase con los caracteres de alguna de las dos clases."""
+        return CharClass._from_intervals(self.intervals + other.intervals)
+
+    def intersection(self, other: "CharClass") -> "CharClass":
+        """Devuelve la clase con los caracteres de ambas clases."""
+        res = []
+        i = j = 0
+        while i < len(self.intervals) and j < len(other.intervals):
+            lo = max(self.intervals[i][0], other.intervals[j][0])
+            hi = min(self.intervals[i][1], other.intervals[j][1])
+            if lo <= hi:
+                res.append((lo, hi))
+            if self.intervals[i][1] < other.intervals[j][1]:
+                i += 1
+            else:
+                j += 1
+        return CharClass._from_intervals(res)
+
+    def negate(self) -> "CharClass":
+        """Devuelve la clase con todos los caracteres que no están en esta."""
+        res = []
+        lo = 0
+        for start, end in self.intervals:
+            if lo < start:
+                res.append((lo, start - 1))
+            lo = end + 1
+        if lo <= CharClass.MAX_CODE:
+            res.append((lo, CharClass.MAX_CODE))
+        return CharClass._from_intervals(res)
+
+    def __contains__(self, char: str) -> bool:
+        code = ord(char)
+        lo, hi = 0, len(self.intervals)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.intervals[mid][1] < code:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < len(self.intervals) and self.intervals[lo][0] <= code
+
+    def __len__(self) -> int:
+        return sum(hi - lo + 1 for lo, hi in self.intervals)
+
+    def chars(self) -> Iterable[str]:
+        """Recorre los caracteres de la clase en orden."""
+        for lo, hi in self.intervals:
+            for code in range(lo, hi + 1):
+                yield chr(code)
+
+    def _match_ends(self, word: str, start: int, memo: dict) -> int:
+        return 1 << (start + 1) if start < len(word) and word[start] in self else 0
+
+    def _build_afnd(self, M: AFND, classes: AlphabetClasses) -> tuple[int, int]:
+        q0, q1 = M.new_state(), M.new_state()
+        for symbol in self._symbols(classes):
+            M.add_transition(q0, q1, symbol)
+        return q0, q1
+
+    def _symbols(self, classes: AlphabetClasses) -> list:
+        """
+        (Interno) Devuelve los símbolos de las transiciones de la clase: una
+        por cada clase del alfabeto que cubre.
+        """
+        return classes.classes_in(self.intervals)
 
-    def __init__(self, exp1: RegEx, exp2: RegEx):
-        self.exp1 = exp1
-        self.exp2 = exp2
-       
-        self._AFD = self.to_afnd().determinize().minimize()
+    def _char_set(self, sets: list["CharClass"]) -> "CharClass":
+        return self
 
-    def naive_match(self, word: str):
-        for i in range(len(word) + 1):
-            if self.exp1.naive_match(word[:i]) and self.exp2.naive_match(word[i:]):
-                return True
-        return False
+    def _positions(self, labels: list, follow: list[set]) -> tuple[bool, set, set]:
+        p = len(labels)
+        labels.append(self)
+        follow.append(set())
+        return False, {p}, {p}
 
-    def to_afnd(self) -> AFND:     
-        M1 = (self.exp1).to_afnd()
-        M2 = (self.exp2).to_afnd()
+    def _literals(self) -> tuple:
+        if len(self.intervals) == 0:
+            return None
+        if len(self) == 1:
+            char = chr(self.intervals[0][0])
+            return char, char, char, char
+        return None, "", "", ""
 
-        M = M1
+    def _length_bounds(self) -> tuple[int, int]:
+        return (1, 1) if len(self.intervals) > 0 else None
 
-        k = 0
-        for q in M2.states:
-            M2._rename_state(q, k) #"q"+str(k))
-            k += 1
+    def _required_chars(self) -> frozenset:
+        if len(self.intervals) == 0:
+            return None
+        return frozenset(chr(self.intervals[0][0])) if len(self) == 1 else frozenset()
 
-        M.states = M.states.union(M2.states)
-        M.alphabet = M.alphabet.union(M2.alphabet)
-        M.transitions = {**M.transitions, **M2.transitions}
+    def _atomic(self):
+        return True
 
-        for f in M.final_states:
-            M.add_transition(f, M2.initial_state, SpecialSymbol.Lambda)
+    def __str__(self):
+        return "[" + "".join(chr(lo) if lo == hi else f"{chr(lo)}-{chr(hi)}"
+                             for lo, hi in self.intervals) + "]"
+
+    @staticmethod
+    def _normalize(intervals: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
+        """(Interno) Ordena los intervalos y une los que se superponen o son contiguos."""
+        res = []
+        for lo, hi in sorted(intervals):
+            if len(res) > 0 and lo <= res[-1][1] + 1:
+                if hi > res[-1][1]:
+                    res[-1] = (res[-1][0], hi)
+            else:
+                res.append((lo, hi))
+        return res
 
-        M.final_states = M2.final_states
 
-        M = M.normalize_states()
-        return M
+class Concat(RegEx):
+    """Expresión regular que denota la concatenación de dos expresiones regulares."""
+
+    def __init__(self, exp1: RegEx, exp2: RegEx):
+        self.exp1 = exp1
+        self.exp2 = exp2
 
+    def _match_ends(self, word: str, start: int, memo: dict) -> int:
+        res = 0
+        middles = self.exp1._naive_ends(word, start, memo)
+        while middles:
+            low = middles & -middles
+            middles ^= low
+            res |= self.exp2._naive_ends(word, low.bit_length() - 1, memo)
+        return res
+
+    def _build_afnd(self, M: AFND, classes: AlphabetClasses) -> tuple[int, int]:
+        i1, f1 = self.exp1._build_afnd(M, classes)
+        i2, f2 = self.exp2._build_afnd(M, classes)
+        M.add_transition(f1, i2, SpecialSymbol.Lambda)
+        return i1, f2
+
+    def _char_set(self, sets: list["CharClass"]) -> "CharClass":
+        for exp in (self.exp1, self.exp2):
+            chars = exp._char_set(sets)
+            if chars is not None:
+                sets.append(chars)
+        return None
+
+    def _positions(self, labels: list, follow: list[set]) -> tuple[bool, set, set]:
+        n1, first1, last1 = self.exp1._positions(labels, follow)
+        n2, first2, last2 = self.exp2._positions(labels, follow)
+        for p in last1:
+            follow[p] |= first2
+        first = first1 | first2 if n1 else first1
+        last = last1 | last2 if n2 else last2
+        return n1 and n2, first, last
+
+    def _literals(self) -> tuple:
+        literals1, literals2 = self.exp1._literals(), self.exp2._literals()
+        if literals1 is None or literals2 is None:
+            return None
+        exact1, prefix1, suffix1, factor1 = literals1
+        exact2, prefix2, suffix2, factor2 = literals2
+        exact = exact1 + exact2 if exact1 is not None and exact2 is not None else None
+        prefix = exact1 + prefix2 if exact1 is not None else prefix1
+        suffix = suffix1 + exact2 if exact2 is not None else suffix2
+        # El sufijo de la primera y el prefijo de la segunda quedan pegados
+        factor = max(factor1, factor2, suffix1 + prefix2, key=len)
+        return exact, prefix, suffix, factor
+
+    def _length_bounds(self) -> tuple[int, int]:
+        bounds1, bounds2 = self.exp1._length_bounds(), self.exp2._length_bounds()
+        if bounds1 is None or bounds2 is None:
+            return None
+        if bounds1[1] is None or bounds2[1] is None:
+            return bounds1[0] + bounds2[0], None
+        return bounds1[0] + bounds2[0], bounds1[1] + bounds2[1]
+
+    def _required_chars(self) -> frozenset:
+        chars1, chars2 = self.exp1._required_chars(), self.exp2._required_chars()
+        if chars1 is None or chars2 is None:
+            return None
+        return chars1 | chars2
 
     def _atomic(self):
         return False
@@ -173,41 +868,60 @@ class Union(RegEx):
     def __init__(self, exp1: RegEx, exp2: RegEx):
         self.exp1 = exp1
         self.exp2 = exp2
-        self._AFD = self.to_afnd().determinize().minimize()
-
-    def naive_match(self, word: str):
-        return self.exp1.naive_match(word) or self.exp2.naive_match(word)
-
-    def to_afnd(self) -> AFND:
-        M1 = (self.exp1).to_afnd()
-        M2 = (self.exp2).to_afnd()
-        M = AFND()
-
-        k = 0
-        for q in M1.states:
-            M1._rename_state(q, str(k))
-            k += 1
-    
-        for q in M2.states:
-            M2._rename_state(q, str(k))
-            k += 1
-            
-        M.alphabet = M1.alphabet.union(M2.alphabet)
-        M.states = M1.states.union(M2.states)
-        M.final_states = M1.final_states.union(M2.final_states)
-
-        M.transitions = {**M1.transitions, **M2.transitions}
-
-        M.add_state("ini", False)
-        M.mark_initial_state("ini")
-
-        M.add_transition("ini", M1.initial_state, SpecialSymbol.Lambda)
-        M.add_transition("ini", M2.initial_state, SpecialSymbol.Lambda)
-        
-        M= M.normalize_states()
-        
-        return M
 
+    def _match_ends(self, word: str, start: int, memo: dict) -> int:
+        return self.exp1._naive_ends(word, start, memo) | self.exp2._naive_ends(word, start, memo)
+
+    def _build_afnd(self, M: AFND, classes: AlphabetClasses) -> tuple[int, int]:
+        q0 = M.new_state()
+        i1, f1 = self.exp1._build_afnd(M, classes)
+        i2, f2 = self.exp2._build_afnd(M, classes)
+        q1 = M.new_state()
+        M.add_transition(q0, i1, SpecialSymbol.Lambda)
+        M.add_transition(q0, i2, SpecialSymbol.Lambda)
+        M.add_transition(f1, q1, SpecialSymbol.Lambda)
+        M.add_transition(f2, q1, SpecialSymbol.Lambda)
+        return q0, q1
+
+    def _char_set(self, sets: list["CharClass"]) -> "CharClass":
+        chars1 = self.exp1._char_set(sets)
+        chars2 = self.exp2._char_set(sets)
+        if chars1 is not None and chars2 is not None:
+            return chars1.union(chars2)
+        for chars in (chars1, chars2):
+            if chars is not None:
+                sets.append(chars)
+        return None
+
+    def _positions(self, labels: list, follow: list[set]) -> tuple[bool, set, set]:
+        n1, first1, last1 = self.exp1._positions(labels, follow)
+        n2, first2, last2 = self.exp2._positions(labels, follow)
+        return n1 or n2, first1 | first2, last1 | last2
+
+    def _literals(self) -> tuple:
+        literals1, literals2 = self.exp1._literals(), self.exp2._literals()
+        if literals1 is None or literals2 is None:
+            return literals2 if literals1 is None else literals1
+        exact1, prefix1, suffix1, _ = literals1
+        exact2, prefix2, suffix2, _ = literals2
+        exact = exact1 if exact1 == exact2 else None
+        prefix = commonprefix([prefix1, prefix2])
+        suffix = commonprefix([suffix1[::-1], suffix2[::-1]])[::-1]
+        return exact, prefix, suffix, max(prefix, suffix, key=len)
+
+    def _length_bounds(self) -> tuple[int, int]:
+        bounds1, bounds2 = self.exp1._length_bounds(), self.exp2._length_bounds()
+        if bounds1 is None or bounds2 is None:
+            return bounds2 if bounds1 is None else bounds1
+        if bounds1[1] is None or bounds2[1] is None:
+            return min(bounds1[0], bounds2[0]), None
+        return min(bounds1[0], bounds2[0]), max(bounds1[1], bounds2[1])
+
+    def _required_chars(self) -> frozenset:
+        chars1, chars2 = self.exp1._required_chars(), self.exp2._required_chars()
+        if chars1 is None or chars2 is None:
+            return chars2 if chars1 is None else chars1
+        return chars1 & chars2
 
     def _atomic(self):
         return False
@@ -222,36 +936,49 @@ class Star(RegEx):
 
     def __init__(self, exp: RegEx):
         self.exp = exp
-        self._AFD = self.to_afnd().determinize().minimize()
-
-    def naive_match(self, word: str):
-        if word == "" or self.exp.naive_match(word):
-            return True
-        for i in range(1, len(word) + 1):
-            if self.exp.naive_match(word[:i]) and self.naive_match(word[i:]):
-                return True
-        return False
-
-    def to_afnd(self) -> AFND:
-        M1 = (self.exp).to_afnd()
-
-        M = M1
-        M.add_state("qA", False)
-        M.mark_initial_state("qA")
-        M.add_state("qB", False)
-
-        M.add_transition("qA", (self.exp).to_afnd().initial_state, SpecialSymbol.Lambda)
-        M.add_transition("qA", "qB", SpecialSymbol.Lambda)
 
-        for q in M.final_states:
-            M.add_transition(q, "qB", SpecialSymbol.Lambda)
-            M.add_transition(q, (self.exp).to_afnd().initial_state, SpecialSymbol.Lambda)
+    def _match_ends(self, word: str, start: int, memo: dict) -> int:
+        # (R*)* y (R+)* aceptan lo mismo que R*: así la clausura de adentro no
+        # se repite desde cada posición (lo que sería cuadrático, como en (a*)*)
+        exp = self.exp
+        while isinstance(exp, (Star, Plus)):
+            exp = exp.exp
+        return exp._naive_repeat(word, 1 << start, memo)
+
+    def _build_afnd(self, M: AFND, classes: AlphabetClasses) -> tuple[int, int]:
+        q0 = M.new_state()
+        i1, f1 = self.exp._build_afnd(M, classes)
+        q1 = M.new_state()
+        M.add_transition(q0, i1, SpecialSymbol.Lambda)
+        M.add_transition(q0, q1, SpecialSymbol.Lambda)
+        M.add_transition(f1, i1, SpecialSymbol.Lambda)
+        M.add_transition(f1, q1, SpecialSymbol.Lambda)
+        return q0, q1
+
+    def _char_set(self, sets: list["CharClass"]) -> "CharClass":
+        chars = self.exp._char_set(sets)
+        if chars is not None:
+            sets.append(chars)
+        return None
+
+    def _positions(self, labels: list, follow: list[set]) -> tuple[bool, set, set]:
+        _, first, last = self.exp._positions(labels, follow)
+        for p in last:
+            follow[p] |= first
+        return True, first, last
+
+    def _literals(self) -> tuple:
+        literals = self.exp._literals()
+        exact = "" if literals is None or literals[0] == "" else None
+        return exact, "", "", ""
+
+    def _length_bounds(self) -> tuple[int, int]:
+        bounds = self.exp._length_bounds()
+        return (0, 0) if bounds is None or bounds[1] == 0 else (0, None)
+
+    def _required_chars(self) -> frozenset:
+        return frozenset()
 
-        M.final_states = set(["qB"])
-
-        M= M.normalize_states()
-        return M
-    
     def _atomic(self):
         return False
 
@@ -264,38 +991,55 @@ class Plus(RegEx):
 
     def __init__(self, exp: RegEx):
         self.exp = exp
-       
-        self._AFD = self.to_afnd().determinize().minimize()
-
-    def naive_match(self, word: str):
-        if self.exp.naive_match(word):
-            return True
-        for i in range(1, len(word) + 1):
-            if self.exp.naive_match(word[:i]) and self.naive_match(word[i:]):
-                return True
-        return False
-
-    def to_afnd(self) -> AFND:
-        M1 = (self.exp).to_afnd()
 
-        M = M1
-        M.add_state("qA", False)
-        M.mark_initial_state("qA")
-        M.add_state("qB", False)
+    def _match_ends(self, word: str, start: int, memo: dict) -> int:
+        # (R+)+ acepta lo mismo que R+, y (R*)+ lo mismo que R* (ver `Star`)
+        exp = self.exp
+        while isinstance(exp, Plus):
+            exp = exp.exp
+        if isinstance(exp, Star):
+            return exp._naive_ends(word, start, memo)
+        return exp._naive_repeat(word, exp._naive_ends(word, start, memo), memo)
+
+    def _build_afnd(self, M: AFND, classes: AlphabetClasses) -> tuple[int, int]:
+        q0 = M.new_state()
+        i1, f1 = self.exp._build_afnd(M, classes)
+        q1 = M.new_state()
+        M.add_transition(q0, i1, SpecialSymbol.Lambda)
+        M.add_transition(f1, i1, SpecialSymbol.Lambda)
+        M.add_transition(f1, q1, SpecialSymbol.Lambda)
+        return q0, q1
+
+    def _char_set(self, sets: list["CharClass"]) -> "CharClass":
+        chars = self.exp._char_set(sets)
+        if chars is not None:
+            sets.append(chars)
+        return None
+
+    def _positions(self, labels: list, follow: list[set]) -> tuple[bool, set, set]:
+        nullable, first, last = self.exp._positions(labels, follow)
+        for p in last:
+            follow[p] |= first
+        return nullable, first, last
+
+    def _literals(self) -> tuple:
+        literals = self.exp._literals()
+        if literals is None:
+            return None
+        exact, prefix, suffix, factor = literals
+        return exact if exact == "" else None, prefix, suffix, factor
+
+    def _length_bounds(self) -> tuple[int, int]:
+        bounds = self.exp._length_bounds()
+        if bounds is None or bounds[1] == 0:
+            return bounds
+        return bounds[0], None
+
+    def _required_chars(self) -> frozenset:
+        return self.exp._required_chars()
 
-        M.add_transition("qA", (self.exp).to_afnd().initial_state, SpecialSymbol.Lambda)
-
-        for q in M.final_states:
-            M.add_transition(q, "qB", SpecialSymbol.Lambda)
-            M.add_transition(q, (self.exp).to_afnd().initial_state, SpecialSymbol.Lambda)
-
-        M.final_states = set(["qB"])
-        M= M.normalize_states()
-        return M
-    
     def _atomic(self) -> bool:
         return False
 
     def __str__(self):
         return f"({self.exp})+" if not self.exp._atomic() else f"{self.exp}+"
-
@@ -0,0 +1,202 @@
+from automata import AFD, AlphabetClasses, Budget, StateLimitExceeded
+from regex import RegEx, Empty, Lambda, Char, CharClass, Concat, Union, Star, Plus
+
+__all__ = ["Derivatives"]
+
+
+class Derivatives:
+    """
+    Construye el AFD de una expresión regular con derivadas de Brzozowski,
+    sin pasar por un AFND.
+
+    Todas las expresiones se arman con constructores que las normalizan
+    (la unión es asociativa, conmutativa e idempotente y junta en una sola
+    clase todas sus alternativas de un carácter, la concatenación es
+    asociativa a derecha y se simplifican ∅, λ y las clausuras anidadas) y se
+    guardan de forma única, así dos expresiones equivalentes bajo esas reglas
+    son el mismo objeto. Eso mantiene finito (y chico) el conjunto de
+    derivadas, que son los estados del AFD.
+    """
+
+    def __init__(self):
+        self._unique = {}
+        self._order = {}
+        self._alternatives = {}
+        self._nullable = {}
+        self._derivatives = {}
+        self.empty = self._intern(("∅",), Empty)
+        self.lambda_ = self._intern(("λ",), Lambda)
+
+    def char_class(self, chars: CharClass) -> RegEx:
+        """Devuelve la expresión normalizada para una clase de caracteres (∅ si es vacía)."""
+        if len(chars.intervals) == 0:
+            return self.empty
+        return self._intern(("[", tuple(chars.intervals)), lambda: chars)
+
+    def concat(self, exp1: RegEx, exp2: RegEx) -> RegEx:
+        """Devuelve la concatenación normalizada de dos expresiones normalizadas."""
+        if exp1 is self.empty or exp2 is self.empty:
+            return self.empty
+        if exp1 is self.lambda_:
+            return exp2
+        if exp2 is self.lambda_:
+            return exp1
+        if isinstance(exp1, Concat):
+            return self.concat(exp1.exp1, self.concat(exp1.exp2, exp2))
+        return self._intern(("·", id(exp1), id(exp2)), lambda: Concat(exp1, exp2))
+
+    def union(self, exp1: RegEx, exp2: RegEx) -> RegEx:
+        """Devuelve la unión normalizada de dos expresiones normalizadas."""
+        alternatives = self._alternatives_of(exp1) | self._alternatives_of(exp2)
+        alternatives.discard(self.empty)
+        chars = [exp for exp in alternatives if isinstance(exp, CharClass)]
+        if len(chars) > 1:
+            alternatives.difference_update(chars)
+            merged = CharClass()
+            for exp in chars:
+                merged = merged.union(exp)
+            alternatives.add(self.char_class(merged))
+        if len(alternatives) == 0:
+            return self.empty
+        ordered = sorted(alternatives, key=self._order.__getitem__)
+        res = ordered[-1]
+        for i in range(len(ordered) - 2, -1, -1):
+            exp = ordered[i]
+            tail = res
+            res = self._intern(("|", id(exp), id(tail)), lambda: Union(exp, tail))
+            self._alternatives[id(res)] = frozenset(ordered[i:])
+        return res
+
+    def star(self, exp: RegEx) -> RegEx:
+        """Devuelve la clausura de Kleene normalizada de una expresión normalizada."""
+        if exp is self.empty or exp is self.lambda_:
+            return self.lambda_
+        if isinstance(exp, Star):
+            return exp
+        return self._intern(("*", id(exp)), lambda: Star(exp))
+
+    def normalize(self, regex: RegEx) -> RegEx:
+        """Reconstruye una expresión regular cualquiera con los constructores normalizados."""
+        if isinstance(regex, Empty):
+            return self.empty
+        if isinstance(regex, Lambda):
+            return self.lambda_
+        if isinstance(regex, Char):
+            return self.char_class(CharClass.of(regex.char))
+        if isinstance(regex, CharClass):
+            return self.char_class(regex)
+        if isinstance(regex, Concat):
+            return self.concat(self.normalize(regex.exp1), self.normalize(regex.exp2))
+        if isinstance(regex, Union):
+            return self.union(self.normalize(regex.exp1), self.normalize(regex.exp2))
+        if isinstance(regex, Star):
+            return self.star(self.normalize(regex.exp))
+        if isinstance(regex, Plus):
+            exp = self.normalize(regex.exp)
+            return self.concat(exp, self.star(exp))
+        raise ValueError(f"No se puede derivar la expresión {regex}.")
+
+    def nullable(self, exp: RegEx) -> bool:
+        """Indica si una expresión normalizada acepta la cadena vacía."""
+        key = id(exp)
+        if key not in self._nullable:
+            if isinstance(exp, (Lambda, Star)):
+                res = True
+            elif isinstance(exp, Concat):
+                res = self.nullable(exp.exp1) and self.nullable(exp.exp2)
+            elif isinstance(exp, Union):
+                res = self.nullable(exp.exp1) or self.nullable(exp.exp2)
+            else:
+                res = False
+            self._nullable[key] = res
+        return self._nullable[key]
+
+    def derivative(self, exp: RegEx, char: str) -> RegEx:
+        """Devuelve la derivada de una expresión normalizada respecto de un carácter."""
+        key = (id(exp), char)
+        if key not in self._derivatives:
+            if isinstance(exp, CharClass):
+                res = self.lambda_ if char in exp else self.empty
+            elif isinstance(exp, Concat):
+                res = self.concat(self.derivative(exp.exp1, char), exp.exp2)
+                if self.nullable(exp.exp1):
+                    res = self.union(res, self.derivative(exp.exp2, char))
+            elif isinstance(exp, Union):
+                res = self.union(self.derivative(exp.exp1, char), self.derivative(exp.exp2, char))
+            elif isinstance(exp, Star):
+                res = self.concat(self.derivative(exp.exp, char), exp)
+            else:
+                res = self.empty
+            self._derivatives[key] = res
+        return self._derivatives[key]
+
+    def to_afd(self, regex: RegEx, complete: bool = True, classes: AlphabetClasses = None,
+               max_states: int = None, budget: Budget = None) -> AFD:
+        """
+        Construye el AFD de la expresión regular. Sus estados son las derivadas
+        distintas de la expresión, numeradas desde 0. Con `complete=False` la
+        derivada ∅ no se agrega y el AFD resultante es parcial. Si se indican
+        las clases del alfabeto, se deriva una vez por clase (respecto de uno
+        de sus caracteres) y las transiciones usan los ids de las clases. Si
+        se indica `max_states` y hay más derivadas, se lanza
+        `StateLimitExceeded`. Si se indica un presupuesto (`Budget`), se
+        verifica cada vez que se agrega un estado.
+        """
+        if classes is None:
+            alphabet = set()
+            self._collect_alphabet(regex, alphabet)
+            symbols = {char: char for char in alphabet}
+        else:
+            symbols = {k: classes.representative(k) for k in range(classes.rest)}
+        start = self.normalize(regex)
+
+        res = AFD()
+        res.alphabet = set(symbols)
+        res.classes = classes
+        names = {id(start): 0}
+        res.add_state(0, self.nullable(start))
+        res.mark_initial_state(0)
+
+        transitions = 0
+        pending = [start]
+        while len(pending) != 0:
+            exp = pending.pop()
+            for symbol, char in symbols.items():
+                target = self.derivative(exp, char)
+                if target is self.empty and not complete:
+                    continue
+                if id(target) not in names:
+                    if max_states is not None and len(names) >= max_states:
+                        raise StateLimitExceeded(max_states)
+                    if budget is not None:
+                        budget.check_dfa(len(names) + 1, transitions)
+                    names[id(target)] = len(names)
+                    res.add_state(names[id(target)], self.nullable(target))
+                    pending.append(target)
+                res.add_transition(names[id(exp)], names[id(target)], symbol)
+                transitions += 1
+        return res
+
+    def _intern(self, key: tuple, build) -> RegEx:
+        """(Interno) Devuelve la única expresión con la clave dada, creándola si hace falta."""
+        if key not in self._unique:
+            exp = build()
+            self._unique[key] = exp
+            self._order[exp] = len(self._order)
+        return self._unique[key]
+
+    def _alternatives_of(self, exp: RegEx) -> set:
+        """(Interno) Devuelve las alternativas de una unión normalizada (o la expresión misma)."""
+        return set(self._alternatives.get(id(exp), (exp,)))
+
+    def _collect_alphabet(self, regex: RegEx, alphabet: set):
+        """(Interno) Agrega a `alphabet` los caracteres que aparecen en la expresión."""
+        if isinstance(regex, Char):
+            alphabet.add(regex.char)
+        elif isinstance(regex, CharClass):
+            alphabet.update(regex.chars())
+        elif isinstance(regex, (Concat, Union)):
+            self._collect_alphabet(regex.exp1, alphabet)
+            self._collect_alphabet(regex.exp2, alphabet)
+        elif isinstance(regex, (Star, Plus)):
+            self._collect_alphabet(regex.exp, alphabet)
@@ -0,0 +1,78 @@
+import sys
+
+from regex import RegEx
+
+__all__ = ["Prefilter"]
+
+
+class Prefilter:
+    """
+    Condiciones necesarias para que una expresión regular acepte una cadena,
+    que se calculan una sola vez sobre el árbol (ver `RegEx._literals`,
+    `RegEx._length_bounds` y `RegEx._required_chars`) y se verifican con
+    operaciones de cadenas de Python (en C), antes de recorrer el AFD:
+
+    - `min_length` y `max_length`: toda cadena aceptada tiene una longitud
+      entre ellos (`max_length` es None si no hay máximo).
+    - `prefix` y `suffix`: toda cadena aceptada empieza y termina con ellos.
+    - `factor`: toda cadena aceptada lo contiene.
+    - `chars`: toda cadena aceptada contiene cada uno de estos caracteres.
+    - `exact`: si no es None, es la única cadena aceptada.
+
+    La longitud se verifica primero, en O(1).
+
+    Si una cadena no cumple las condiciones, la expresión seguro no la
+    acepta; si las cumple, hay que preguntarle al AFD.
+
+    Si la expresión es sobre bytes (ver `RegEx.to_utf8`), los literales se
+    guardan como `bytes` y se verifican sobre `bytes`.
+    """
+
+    def __init__(self, regex: RegEx):
+        literals = regex._literals()
+        # Si la expresión no acepta ninguna cadena, ninguna pasa el filtro
+        self.never = literals is None
+        self.exact, self.prefix, self.suffix, self.factor = literals if literals is not None else (None, "", "", "")
+        # Para buscar alcanza con una subcadena obligatoria: la más larga
+        self.required = max(self.prefix, self.suffix, self.factor, key=len)
+        bounds = regex._length_bounds()
+        self.min_length, self.max_length = bounds if bounds is not None else (0, None)
+        self._max_length = sys.maxsize if self.max_length is None else self.max_length
+        self.chars = regex._required_chars() or frozenset()
+        # Los caracteres que ya están en los literales no hace falta buscarlos
+        self._match_chars = tuple(sorted(self.chars - set(self.prefix + self.suffix + self.factor)))
+        self._search_chars = tuple(sorted(self.chars - set(self.required)))
+        if regex._binary:
+            # Cada carácter de la expresión es un byte
+            self.exact = self.exact.encode("latin-1") if self.exact is not None else None
+            self.prefix, self.suffix, self.factor, self.required = (
+                literal.encode("latin-1") for literal in (self.prefix, self.suffix, self.factor, self.required))
+            self._match_chars = tuple(char.encode("latin-1") for char in self._match_chars)
+            self._search_chars = tuple(char.encode("latin-1") for char in self._search_chars)
+
+    def check(self, word: str) -> bool:
+        """Indica si la cadena entera puede ser aceptada por la expresión."""
+        if self.exact is not None or self.never:
+            return word == self.exact
+        if not self.min_length <= len(word) <= self._max_length:
+            return False
+        if not (word.startswith(self.prefix) and word.endswith(self.suffix) and self.factor in word):
+            return False
+        for char in self._match_chars:
+            if char not in word:
+                return False
+        return True
+
+    def check_search(self, word: str) -> bool:
+        """Indica si alguna subcadena de la cadena puede ser aceptada por la expresión."""
+        if self.never or len(word) < self.min_length or self.required not in word:
+            return False
+        for char in self._search_chars:
+            if char not in word:
+                return False
+        return True
+
+    def __str__(self):
+        return f"Prefilter<length={self.min_length}..{'' if self.max_length is None else self.max_length}, " \
+            f"prefix={self.prefix!r}, suffix={self.suffix!r}, factor={self.factor!r}, " \
+            f"chars={''.join(sorted(self.chars))!r}, exact={self.exact!r}>"
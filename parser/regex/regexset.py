@@ -0,0 +1,88 @@
+from typing import Iterable
+
+from automata import AFND, AlphabetClasses, DenseAFD
+from automata.afnd import SpecialSymbol
+from regex import RegEx, CharClass, Concat, Star
+
+__all__ = ["RegexSet"]
+
+
+class RegexSet:
+    """
+    Conjunto de expresiones regulares que se reconocen juntas, con un único
+    AFD mínimo: cada cadena se lee una sola vez y se obtienen todos los
+    patrones (por su posición en el conjunto) que la aceptan.
+
+    El AFND es la unión de los AFNDs de Thompson de los patrones, y el estado
+    final del patrón i lleva la etiqueta 1 << i (ver `AF.tags`). Al
+    determinizar, cada subconjunto junta las etiquetas de sus estados, y al
+    minimizar no se juntan estados finales con etiquetas distintas, así que
+    el estado en el que termina el recorrido dice qué patrones aceptan.
+
+    Como en `RegEx`, el AFD se construye recién cuando hace falta, y el de
+    `search` (el de los patrones Σ*·R·Σ*) aparte, la primera vez que se usa.
+    Ese AFD puede ser mucho más grande que el de `match`, porque tiene que
+    recordar cuáles patrones ya aparecieron.
+    """
+
+    def __init__(self, regexes: Iterable[RegEx]):
+        self.regexes = list(regexes)
+        self._AFD = None
+        self._matcher = None
+        self._search = None
+
+    def __len__(self) -> int:
+        """Devuelve la cantidad de patrones."""
+        return len(self.regexes)
+
+    def compile(self) -> "RegexSet":
+        """
+        Construye (si todavía no existe) el AFD mínimo del conjunto.
+        Devuelve el mismo conjunto para poder encadenar llamados.
+        """
+        if self._AFD is None:
+            classes = AlphabetClasses(chars.intervals for regex in self.regexes for chars in regex._alphabet_sets())
+            self._AFD = self.to_afnd(classes).determinize(complete=False).minimize()
+            self._matcher = DenseAFD(self._AFD)
+        return self
+
+    def is_compiled(self) -> bool:
+        """Indica si el conjunto ya tiene su AFD construido."""
+        return self._AFD is not None
+
+    def to_afnd(self, classes: AlphabetClasses = None) -> AFND:
+        """
+        Arma el AFND del conjunto: un estado inicial con transiciones lambda a
+        los AFNDs de Thompson de los patrones, cuyos estados finales llevan
+        como etiqueta el bit de su patrón.
+        """
+        M = AFND()
+        M.classes = classes
+        initial = M.new_state()
+        M.mark_initial_state(initial)
+        for i, regex in enumerate(self.regexes):
+            q0, qf = regex._build_afnd(M, classes)
+            M.add_transition(initial, q0, SpecialSymbol.Lambda)
+            M.final_states.add(qf)
+            M.tags[qf] = 1 << i
+        return M
+
+    def matches(self, word: str) -> list[int]:
+        """Devuelve las posiciones de los patrones que aceptan la cadena entera."""
+        return self._ids(self.compile()._matcher.match_tags(word))
+
+    def search(self, word: str) -> list[int]:
+        """Devuelve las posiciones de los patrones que aceptan alguna subcadena de la cadena."""
+        if self._search is None:
+            anything = Star(CharClass().negate())
+            self._search = RegexSet(Concat(anything, Concat(regex, anything)) for regex in self.regexes)
+        return self._search.matches(word)
+
+    def _ids(self, tags: int) -> list[int]:
+        """(Interno) Devuelve las posiciones de los bits prendidos de las etiquetas."""
+        res = []
+        while tags:
+            low = tags & -tags
+            res.append(low.bit_length() - 1)
+            tags ^= low
+        return res
@@ -0,0 +1,102 @@
+from regex import RegEx, Empty, Lambda, Char, CharClass, Concat, Union, Star, Plus
+
+__all__ = ["utf8_sequences", "to_utf8"]
+
+# Los surrogates no se pueden codificar en UTF-8
+SURROGATES = (0xD800, 0xDFFF)
+# Último código de cada largo de codificación (1 a 4 bytes)
+LENGTH_LIMITS = (0x7F, 0x7FF, 0xFFFF, 0x10FFFF)
+
+
+def utf8_sequences(lo: int, hi: int) -> list[list[tuple[int, int]]]:
+    """
+    Parte el intervalo de códigos [lo, hi] en secuencias de rangos de bytes:
+    cada secuencia [(lo1, hi1), ..., (lon, hin)] acepta las codificaciones
+    UTF-8 cuyo i-ésimo byte está en [loi, hii], y cada código del intervalo
+    (salvo los surrogates) se codifica con exactamente una de ellas.
+
+    Como en RE2, primero se parte el intervalo según el largo de la
+    codificación y después hasta que los bytes de continuación de cada
+    parte recorran rangos completos, así el producto de los rangos de bytes
+    es exactamente la parte.
+    """
+    res = []
+    start = lo
+    for limit in LENGTH_LIMITS:
+        end = min(hi, limit)
+        if start <= end:
+            if start <= SURROGATES[1] and SURROGATES[0] <= end:
+                for part_lo, part_hi in ((start, SURROGATES[0] - 1), (SURROGATES[1] + 1, end)):
+                    if part_lo <= part_hi:
+                        _split(part_lo, part_hi, res)
+            else:
+                _split(start, end, res)
+            start = end + 1
+    return res
+
+
+def _split(lo: int, hi: int, res: list):
+    """(Interno) Agrega a `res` las secuencias de un intervalo cuyos códigos se codifican con el mismo largo."""
+    n = len(chr(lo).encode("utf-8"))
+    for i in range(1, n):
+        # Los últimos i bytes de continuación tienen 6 bits cada uno
+        mask = (1 << (6 * i)) - 1
+        if lo & ~mask != hi & ~mask:
+            if lo & mask != 0:
+                _split(lo, lo | mask, res)
+                _split((lo | mask) + 1, hi, res)
+                return
+            if hi & mask != mask:
+                _split(lo, (hi & ~mask) - 1, res)
+                _split(hi & ~mask, hi, res)
+                return
+    res.append(list(zip(chr(lo).encode("utf-8"), chr(hi).encode("utf-8"))))
+
+
+def to_utf8(regex: RegEx) -> RegEx:
+    """
+    Devuelve la expresión regular equivalente sobre bytes: cada carácter y
+    cada clase de caracteres se reemplaza por sus codificaciones en UTF-8
+    (ver `utf8_sequences`), donde el byte b se representa con el carácter de
+    código b. Lo demás queda igual, así el AFD de la expresión resultante
+    tiene a lo sumo 256 símbolos y reconoce bytes sin decodificarlos.
+    """
+    if isinstance(regex, Empty):
+        return Empty()
+    if isinstance(regex, Lambda):
+        return Lambda()
+    if isinstance(regex, Char):
+        return _bytes_of(regex.char.encode("utf-8", "surrogatepass"))
+    if isinstance(regex, CharClass):
+        res = None
+        for lo, hi in regex.intervals:
+            for sequence in utf8_sequences(lo, hi):
+                exp = _sequence(sequence)
+                res = exp if res is None else Union(res, exp)
+        return res if res is not None else CharClass()
+    if isinstance(regex, Concat):
+        return Concat(to_utf8(regex.exp1), to_utf8(regex.exp2))
+    if isinstance(regex, Union):
+        return Union(to_utf8(regex.exp1), to_utf8(regex.exp2))
+    if isinstance(regex, Plus):
+        return Plus(to_utf8(regex.exp))
+    if isinstance(regex, Star):
+        return Star(to_utf8(regex.exp))
+    raise ValueError(f"No se puede codificar la expresión {regex}.")
+
+
+def _bytes_of(data: bytes) -> RegEx:
+    """(Interno) Devuelve la concatenación de los caracteres de los bytes dados."""
+    res = Char(chr(data[-1]))
+    for b in reversed(data[:-1]):
+        res = Concat(Char(chr(b)), res)
+    return res
+
+
+def _sequence(sequence: list[tuple[int, int]]) -> RegEx:
+    """(Interno) Devuelve la concatenación de las clases de una secuencia de rangos de bytes."""
+    exps = [Char(chr(lo)) if lo == hi else CharClass([(chr(lo), chr(hi))]) for lo, hi in sequence]
+    res = exps[-1]
+    for exp in reversed(exps[:-1]):
+        res = Concat(exp, res)
+    return res
@@ -0,0 +1,447 @@
+import sys
+
+import pytest
+
+from automata import (AFD, AFND, AFNDSimulation, AlphabetClasses, BitParallelAFND, Budget, BudgetExceeded, DenseAFD,
+                      LazyAFD, PackedAFD, StateLimitExceeded)
+from automata.frozen import DEAD, NORMAL, UNIVERSAL
+from automata.afnd import SpecialSymbol
+from regex import Char, CharClass, Concat, Empty, Lambda, Plus, Star, Union
+from regex.derivatives import Derivatives
+
+
+def afnd_from(initial, finals, transitions) -> AFND:
+    """Arma un AFND a partir de una lista de transiciones (origen, destino, símbolo)."""
+    M = AFND()
+    for state1, state2, _ in transitions:
+        for state in (state1, state2):
+            if state not in M.states:
+                M.add_state(state, state in finals)
+    M.mark_initial_state(initial)
+    for state1, state2, char in transitions:
+        M.add_transition(state1, state2, char)
+    return M
+
+
+class TestDeterminize:
+
+    def test_subsets_with_colliding_names(self):
+        '''Los subconjuntos {1, 12} y {11, 2} son estados distintos del AFD'''
+        M = afnd_from("0", {"12"}, [
+            ("0", "1", "a"), ("0", "12", "a"),
+            ("0", "11", "b"), ("0", "2", "b"),
+        ])
+        afd = M.determinize()
+        assert afd.match_string("a")
+        assert not afd.match_string("b")
+
+    def test_lambda_closure_is_precomputed(self):
+        '''Las transiciones lambda (incluso en ciclos) se siguen hasta el final'''
+        M = afnd_from(0, {3}, [
+            (0, 1, SpecialSymbol.Lambda), (1, 0, SpecialSymbol.Lambda),
+            (1, 2, "a"), (2, 1, SpecialSymbol.Lambda), (2, 3, SpecialSymbol.Lambda),
+        ])
+        assert M.lambda_closure({0}) == {0, 1}
+        afd = M.determinize()
+        assert afd.match_string("a") and afd.match_string("aaa")
+        assert not afd.match_string("")
+
+    def test_sparse_determinize(self):
+        '''Sin completar, el AFD no tiene el subconjunto vacío ni transiciones hacia él'''
+        regex = Concat(Char('a'), Star(Union(Char('b'), Char('c'))))
+        afd = regex.to_afnd().determinize(complete=False)
+        assert not afd.is_complete()
+        assert all(len(afd.transitions[state]) <= 2 for state in afd.states)
+        assert afd.match_string("abcb") and not afd.match_string("ba")
+
+
+    def test_reverse(self):
+        '''El AFND reverso acepta las cadenas dadas vuelta'''
+        regex = Concat(Char('a'), Concat(Plus(Char('b')), Char('c')))
+        afd = regex.to_afnd().reverse().determinize(complete=False).minimize()
+        assert afd.match_string("cba") and afd.match_string("cbbba")
+        assert not afd.match_string("abc") and not afd.match_string("ca")
+
+
+class TestMinimize:
+
+    def test_partial_minimize_has_no_sink(self):
+        '''Minimizar un AFD parcial da el AFD mínimo sin estado trampa'''
+        regex = Concat(Char('a'), Concat(Char('b'), Char('c')))
+        complete = regex.to_afnd().determinize().minimize()
+        partial = regex.to_afnd().determinize(complete=False).minimize()
+        assert complete.size() == 5 and complete.is_complete()
+        assert partial.size() == 4
+        for word in ["", "a", "abc", "abcc", "b"]:
+            assert partial.match_string(word) == complete.match_string(word)
+
+    def test_partial_minimize_removes_dead_states(self):
+        '''Los estados desde los que no se llega a uno final se eliminan'''
+        regex = Union(Concat(Char('a'), Empty()), Char('b'))
+        afd = regex.to_afnd().determinize(complete=False).minimize()
+        assert afd.size() == 2
+        assert afd.match_string("b") and not afd.match_string("a")
+
+    def test_partial_minimize_empty_language(self):
+        '''El lenguaje vacío minimiza a un único estado inicial sin transiciones'''
+        afd = Concat(Char('a'), Empty()).to_afnd().determinize(complete=False).minimize()
+        assert afd.size() == 1 and not afd.match_string("a")
+
+    def test_merges_equivalent_states(self):
+        '''Contar las a módulo 6 aceptando múltiplos de 3 se minimiza a 3 estados'''
+        M = AFD()
+        for q in range(6):
+            M.add_state(q, q % 3 == 0)
+        for q in range(6):
+            M.add_transition(q, (q + 1) % 6, "a")
+            M.add_transition(q, q, "b")
+        M.mark_initial_state(0)
+        minimo = M.minimize()
+        assert minimo.size() == 3 and minimo.initial_state == 0
+        for n in range(10):
+            assert minimo.match_string("ab" * n) == (n % 3 == 0)
+        assert minimo.minimize().size() == 3
+
+    def test_tags_are_kept(self):
+        '''Determinizar junta las etiquetas de cada subconjunto y minimizar no mezcla etiquetas distintas'''
+        M = afnd_from(0, {1, 2}, [(0, 1, "a"), (0, 2, "a"), (0, 2, "b")])
+        M.tags = {1: 0b01, 2: 0b10}
+        minimo = M.determinize(complete=False).minimize()
+        assert minimo.size() == 3
+        assert sorted(minimo.tags.values()) == [0b10, 0b11]
+        dense = DenseAFD(minimo)
+        assert dense.match_tags("a") == 0b11 and dense.match_tags("b") == 0b10
+        assert dense.match_tags("") == 0 and dense.match_tags("ab") == 0
+
+    def test_complete_minimize_keeps_single_sink(self):
+        '''Un AFD completo con varios estados trampa minimiza a uno completo con un único estado trampa'''
+        M = AFD()
+        for q in range(4):
+            M.add_state(q, q == 1)
+        for q, a, b in [(0, 1, 2), (1, 3, 2), (2, 3, 2), (3, 2, 3)]:
+            M.add_transition(q, a, "a")
+            M.add_transition(q, b, "b")
+        M.mark_initial_state(0)
+        minimo = M.minimize()
+        assert minimo.is_complete()
+        assert minimo.size() == 3 and set(minimo.states) == {0, 1, 2}
+        assert minimo.match_string("a") and not minimo.match_string("ab")
+
+
+class TestAlphabetClasses:
+
+    def test_partition(self):
+        '''Los caracteres que están en los mismos conjuntos quedan en la misma clase'''
+        classes = AlphabetClasses([[(ord("a"), ord("f"))], [(ord("a"), ord("c"))], [(ord("x"), ord("x"))]])
+        assert len(classes) == 4
+        assert classes.lookup("a") == classes.lookup("c") != classes.lookup("d")
+        assert classes.lookup("d") == classes.lookup("f")
+        assert classes.lookup("z") == classes.lookup("?") == classes.rest
+        assert classes.classes_in([(ord("b"), ord("e"))]) == [classes.lookup("b"), classes.lookup("d")]
+        assert classes.classes_in([(ord("e"), ord("z"))]) == [classes.lookup("e"), classes.lookup("x"), classes.rest]
+
+    def test_regex_classes(self):
+        '''Cada unión de caracteres de la expresión es un único conjunto'''
+        letters = Union(Char('a'), Union(Char('b'), Char('c')))
+        regex = Concat(Plus(letters), Concat(Char('b'), Star(Union(Char('a'), Lambda()))))
+        classes = regex.alphabet_classes()
+        assert classes.members == [[(ord("a"), ord("a"))], [(ord("b"), ord("b"))], [(ord("c"), ord("c"))]]
+        afd = regex.compile()._AFD
+        assert afd.classes.members == classes.members and afd.alphabet == {0, 1, 2}
+        assert regex.match("cab") and regex.match("bbaa") and not regex.match("ba?")
+
+
+class TestDenseAFD:
+
+    def test_dense_table(self):
+        '''La tabla densa tiene un estado trampa explícito y acepta lo mismo que el AFD'''
+        afd = Concat(Char('a'), Star(Union(Char('b'), Char('c')))).to_afnd().determinize(complete=False).minimize()
+        dense = DenseAFD(afd)
+        assert dense.size() == afd.size() + 1 and dense.sink == afd.size()
+        assert len(dense.table) == dense.n_states * dense.n_classes
+        assert dense.accepting[0] == 0 and dense.accepting[dense.sink] == 0
+        for word in ["", "a", "abcb", "ba", "abd", "añ"]:
+            assert dense.match_string(word) == afd.match_string(word)
+
+    def test_dense_with_classes(self):
+        '''Con clases del alfabeto se reconocen también caracteres fuera de latin-1'''
+        regex = Concat(Plus(CharClass([('a', 'z')]).negate()), Char('€'))
+        dense = DenseAFD(regex.compile()._AFD)
+        assert dense.match_string("ÑANDÚ€") and dense.match_string("€€")
+        assert not dense.match_string("abc€") and not dense.match_string("€")
+
+    def test_dense_translates_lazily(self):
+        '''Cortar en un estado muerto cuesta lo leído hasta ahí: el resto de la cadena no se traduce'''
+        regex = Concat(Star(Char('a')), Char('b'))
+        dense = DenseAFD(regex.compile()._AFD)
+        translated = []
+        translate = dense.classes.translate
+        dense.classes.translate = lambda word: translated.append(len(word)) or translate(word)
+        assert not dense.match_string("c" + "€" * 10 ** 5) and translated == []
+        assert not dense.match_string("a" * 100 + "c" + "€" * 10 ** 5) and sum(translated) < 300
+        assert dense.match_string("a" * 1000 + "b") and not dense.match_string("a" * 1000 + "€")
+        # Las cadenas cortas se traducen de una vez, salvo que la expresión empiece con pocos caracteres
+        lower = CharClass([('a', 'z')])
+        for regex, probed in [(Concat(Star(lower), Char('b')), False), (Concat(Char('w'), Star(lower)), True)]:
+            dense = DenseAFD(regex.compile()._AFD)
+            translated = []
+            translate = dense.classes.translate
+            dense.classes.translate = lambda word: translated.append(len(word)) or translate(word)
+            assert not dense.match_string("X" * 20) and dense.match_string("w" * 19 + "b")
+            assert translated == ([20] if probed else [20, 20])
+
+    def test_packed_table(self):
+        '''La tabla comprimida sólo guarda las transiciones que no son la de defecto'''
+        regex = Concat(Star(CharClass([('a', 'z')])), Concat(Char('x'), Char('y')))
+        afd = regex.compile()._AFD
+        dense, packed = DenseAFD(afd), PackedAFD(afd)
+        stored = [i for i in range(len(packed.check)) if packed.check[i] != -1]
+        assert len(stored) < dense.n_states * dense.n_classes
+        assert all(packed.check[packed.base[s] + k] != s or packed.next[packed.base[s] + k] != packed.default[s]
+                   for s in range(packed.n_states) for k in range(packed.n_classes))
+        for word in ["", "xy", "abcxy", "xyx", "axyxy", "ax", "ñxy"]:
+            assert packed.match_string(word) == dense.match_string(word) == afd.match_string(word)
+        # La memoria cuenta todo lo que se guarda, no sólo la tabla
+        assert dense.nbytes() > sys.getsizeof(dense.table) + sys.getsizeof(dense.accepting)
+        assert packed.nbytes() > sum(map(sys.getsizeof, (packed.base, packed.default, packed.next, packed.check)))
+
+    def test_compile_layout(self):
+        '''La forma compilada se elige al compilar y se puede cambiar sin reconstruir el AFD'''
+        regex = Concat(Char('a'), Plus(Char('b')))
+        assert isinstance(regex.compile()._matcher, DenseAFD)
+        afd = regex._AFD
+        assert isinstance(regex.compile(layout="packed")._matcher, PackedAFD) and regex._AFD is afd
+        assert isinstance(regex.compile()._matcher, PackedAFD)
+        assert regex.match("abb") and not regex.match("ba")
+        with pytest.raises(ValueError):
+            regex.compile(layout="sparse")
+
+    def test_dead_and_universal_states(self):
+        '''Los estados muertos y universales se detectan al compilar y cortan el recorrido'''
+        anything = CharClass().negate()
+        regex = Concat(Char('a'), Concat(Char('b'), Star(anything)))
+        for layout in [DenseAFD, PackedAFD]:
+            matcher = layout(regex.compile()._AFD)
+            assert sorted(matcher.kind) == [UNIVERSAL, DEAD, NORMAL, NORMAL]
+            assert matcher.kind[matcher.sink] == DEAD and matcher.kind[0] == NORMAL
+            assert matcher.match_string("ab") and matcher.match_string("ab€ñ?")
+            assert not matcher.match_string("ba") and not matcher.match_string("a")
+        # Si el estado inicial ya es universal (o muerto) no se lee la cadena
+        assert DenseAFD(Star(anything).compile()._AFD).match_string("lo que sea")
+        assert DenseAFD(Union(Char('a'), Star(Union(CharClass.of("a"), CharClass.of("a").negate())))
+                        .compile()._AFD)._start == UNIVERSAL
+
+    def test_accelerated_states(self):
+        '''Los estados que casi siempre vuelven a sí mismos se saltan con bytes.find y aceptan lo mismo'''
+        anything = CharClass().negate()
+        regex = Concat(Star(anything), Concat(Char('q'), Concat(Star(anything), Concat(Char('z'), Star(anything)))))
+        afd = regex.compile()._AFD
+        dense = DenseAFD(afd)
+        # Antes de la q y entre la q y la z
+        assert len(dense._accelerated) == 2
+        for word in ["a" * 300 + "q" + "b" * 300 + "z", "a" * 300 + "z" + "b" * 300 + "q",
+                     "q" * 400 + "z", "z" * 400, "q" + "€" * 300 + "z" + "a" * 10, "x" * 256]:
+            assert dense.match_string(word) == afd.match_string(word)
+        assert dense.skipped > 0
+        # Las cadenas cortas se recorren de a un carácter, las de una línea común ya se aceleran
+        skipped = dense.skipped
+        assert dense.match_string("aqbz") and dense.skipped == skipped
+        assert dense.match_string("a" * 40 + "q" + "b" * 40 + "z") and dense.skipped == skipped + 80
+        # Los estados acelerados son las primeras filas de la tabla
+        assert sorted(dense._accelerated) == [0, dense.n_classes] == [0, dense._accelerated_limit // 2]
+        # No se aceleran los estados de los que se sale con clases grandes, como los espacios en [a-z]*
+        lower = CharClass([('a', 'z')])
+        for regex in [Star(lower), Concat(Star(lower), Concat(Char('w'), Star(lower)))]:
+            assert DenseAFD(regex.compile()._AFD)._accelerated == {}
+        # [^ab]*a sale sólo con la a y la b
+        assert len(DenseAFD(Concat(Star(CharClass.of("ab").negate()), Char('a')).compile()._AFD)._accelerated) == 1
+
+
+class TestLazyAFD:
+
+    @staticmethod
+    def nth_from_last(n: int):
+        """(a|b)*a(a|b){n}: el AFD mínimo tiene 2^(n+1) estados."""
+        ab = Union(Char('a'), Char('b'))
+        regex = Concat(Star(ab), Char('a'))
+        for _ in range(n):
+            regex = Concat(regex, ab)
+        return regex
+
+    def test_lazy_builds_reached_states(self):
+        '''Sólo se construyen los estados del AFD a los que llegan las cadenas'''
+        regex = self.nth_from_last(16)
+        lazy = LazyAFD(regex.to_afnd(regex.alphabet_classes()))
+        assert lazy.size() == 1
+        assert lazy.match_string("a" * 17) and not lazy.match_string("b" * 40)
+        assert not lazy.match_string("a" * 17 + "c")
+        assert lazy.size() < 40 and lazy.flushes == 0
+
+    def test_lazy_flush(self):
+        '''Si se llena la tabla se vacía, y se sigue aceptando lo mismo que con el AFD'''
+        regex = self.nth_from_last(4)
+        afd = regex.to_afnd().determinize()
+        lazy = LazyAFD(regex.to_afnd(), max_states=3)
+        words = ["", "a", "ab", "abbbb", "babab", "aaaaab", "abababbbabaa", "bbbbbbbbbbbbbbbabbbb"]
+        for word in words * 2:
+            assert lazy.match_string(word) == afd.match_string(word)
+        assert lazy.flushes > 0 and lazy.size() <= 3
+        with pytest.raises(ValueError):
+            LazyAFD(regex.to_afnd(), max_states=2)
+
+    def test_compile_engine(self):
+        '''El motor se elige al compilar y se puede cambiar sin reconstruir el AFD'''
+        regex = Concat(Char('a'), Plus(Char('b')))
+        assert isinstance(regex.compile(engine="lazy")._matcher, LazyAFD) and regex._AFD is None
+        assert regex.is_compiled()
+        assert regex.match("abb") and not regex.match("ba") and regex.search("xabx")
+        assert isinstance(regex.compile(engine="dfa")._matcher, DenseAFD)
+        afd = regex._AFD
+        assert isinstance(regex.compile(engine="lazy", max_states=5)._matcher, LazyAFD) and regex._AFD is afd
+        assert regex._matcher.max_states == 5
+        with pytest.raises(ValueError):
+            regex.compile(engine="backtracking")
+
+    def test_compile_rejects_unused_options(self):
+        '''`is_compiled` vale para cualquier motor, y no se aceptan opciones que el motor no usa'''
+        for engine in ["lazy", "nfa", "bitparallel"]:
+            regex = Concat(Char('a'), Plus(Char('b')))
+            assert not regex.is_compiled() and regex.compile(engine=engine).is_compiled()
+            with pytest.raises(ValueError):
+                regex.compile(layout="packed")
+            assert regex._engine == engine and regex.is_compiled()
+        with pytest.raises(ValueError):
+            Char('a').compile(engine="bitparallel", construction="thompson")
+        assert Char('a').compile(engine="bitparallel", construction="glushkov").match("a")
+        assert isinstance(Char('a').compile(engine="dfa", layout="packed")._matcher, PackedAFD)
+
+
+class TestAFNDSimulation:
+
+    def test_simulation_matches_afd(self):
+        '''La simulación del AFND acepta lo mismo que el AFD, con o sin clases del alfabeto'''
+        regex = TestLazyAFD.nth_from_last(5)
+        afd = regex.to_afnd().determinize()
+        for simulation in [AFNDSimulation(regex.to_afnd()), AFNDSimulation(regex.to_afnd(regex.alphabet_classes())),
+                           AFNDSimulation(regex.to_position_automaton())]:
+            assert simulation.size() <= regex.to_afnd().size()
+            for word in ["", "a", "abbbbb", "babbbbb", "aaaaaaa", "abababbbabaa", "abbbbbc", "ñ"]:
+                assert simulation.match_string(word) == afd.match_string(word)
+
+    def test_state_limit(self):
+        '''Si el AFD pasa del máximo de estados no se construye, y `compile` pasa a simular el AFND'''
+        regex = TestLazyAFD.nth_from_last(12)
+        with pytest.raises(StateLimitExceeded):
+            regex.to_afnd().determinize(complete=False, max_states=100)
+        with pytest.raises(StateLimitExceeded):
+            Derivatives().to_afd(regex, complete=False, max_states=100)
+        assert regex.to_afnd().determinize(complete=False, max_states=2 ** 15).size() >= 2 ** 13
+        regex.compile(max_states=100)
+        assert regex._engine == "nfa" and isinstance(regex._matcher, AFNDSimulation) and regex._AFD is None
+        assert regex.is_compiled()
+        assert regex.match("a" * 13) and not regex.match("b" * 13) and regex.search("xa" + "b" * 12 + "x")
+        assert list(Concat(Char('a'), Star(Char('b'))).compile(engine="nfa").finditer("xabbxa")) == [(1, 4), (5, 6)]
+
+    def test_finditer_state_limit(self):
+        '''`finditer` no construye AFDs de más de `max_states` estados: busca las ocurrencias con el motor de la expresión'''
+        line = "xx" + "ab" * 20 + "c" + "b" * 16 + "a" * 17
+        expected = [(2, 41), (43, 76)]
+        regex = TestLazyAFD.nth_from_last(16).compile(max_states=1000)
+        assert regex._engine == "nfa" and list(regex.finditer(line)) == expected
+        assert isinstance(regex._spans[0], AFNDSimulation) and regex._spans[1] is None
+        # (a|b){16}a tiene un AFD chico, pero el de la reversa de (a|b){16}a·Σ* es exponencial
+        ab = Union(Char('a'), Char('b'))
+        regex = ab
+        for _ in range(15):
+            regex = Concat(regex, ab)
+        regex = Concat(regex, Char('a')).compile(max_states=1000)
+        assert regex._engine == "dfa" and list(regex.finditer("x" + "ab" * 20)) == [(1, 18), (19, 36)]
+        assert regex._spans[1] is None
+        regex = TestLazyAFD.nth_from_last(16).compile(engine="lazy", max_states=50)
+        assert list(regex.finditer(line)) == expected
+        assert isinstance(regex._spans[0], LazyAFD) and regex._spans[0].size() <= 50
+        regex = TestLazyAFD.nth_from_last(16).compile(budget=Budget(dfa_states=1000), fallback="lazy")
+        assert list(regex.finditer(line)) == expected and isinstance(regex._spans[0], LazyAFD)
+        assert list(Star(Char('a')).compile(engine="nfa").finditer("baab")) == [(0, 0), (1, 3), (3, 3), (4, 4)]
+
+    def test_derivatives_fallback(self):
+        '''Con derivadas (que no arman un AFND) los motores y el cambio de motor usan el AFND de Thompson'''
+        regex = TestLazyAFD.nth_from_last(12).compile("derivatives", max_states=100)
+        assert regex._engine == "nfa" and regex.match("a" * 13) and not regex.match("b" * 13)
+        for engine in ["nfa", "lazy"]:
+            regex = TestLazyAFD.nth_from_last(5).compile("derivatives", engine=engine)
+            assert regex.match("a" * 6) and not regex.match("b" * 6)
+
+
+class TestBudget:
+
+    def test_limits(self):
+        '''Cada construcción lanza `BudgetExceeded` apenas pasa de alguno de los límites'''
+        regex = TestLazyAFD.nth_from_last(12)
+        with pytest.raises(BudgetExceeded) as e:
+            regex.to_afnd(budget=Budget(nfa_states=10))
+        assert e.value.resource == "nfa_states" and e.value.limit == 10
+        with pytest.raises(BudgetExceeded):
+            regex.to_position_automaton(budget=Budget(nfa_states=10))
+        with pytest.raises(BudgetExceeded) as e:
+            regex.to_afnd().determinize(budget=Budget(dfa_states=100))
+        assert e.value.resource == "dfa_states"
+        with pytest.raises(BudgetExceeded) as e:
+            Derivatives().to_afd(regex, budget=Budget(memory=10 ** 5))
+        assert e.value.resource == "memory"
+        with pytest.raises(BudgetExceeded) as e:
+            regex.to_afnd().determinize(budget=Budget(seconds=0.01))
+        assert e.value.resource == "seconds"
+        afd = regex.to_afnd().determinize(complete=False)
+        with pytest.raises(BudgetExceeded) as e:
+            afd.minimize(Budget(memory=10 ** 5))
+        assert e.value.resource == "memory"
+        assert afd.minimize(Budget(dfa_states=10 ** 5, seconds=60)).size() == 2 ** 13
+        assert issubclass(StateLimitExceeded, BudgetExceeded) and issubclass(BudgetExceeded, ValueError)
+        with pytest.raises(ValueError):
+            Budget(seconds=0)
+
+    def test_compile_fallback(self):
+        '''`compile` lanza `BudgetExceeded`, o pasa al motor indicado si no puede construir el AFD'''
+        budget = Budget(dfa_states=100)
+        with pytest.raises(BudgetExceeded):
+            TestLazyAFD.nth_from_last(12).compile(budget=budget)
+        for fallback, matcher in [("nfa", AFNDSimulation), ("lazy", LazyAFD)]:
+            regex = TestLazyAFD.nth_from_last(12).compile(budget=budget, fallback=fallback)
+            assert regex._engine == fallback and isinstance(regex._matcher, matcher) and regex._AFD is None
+            assert regex.match("a" * 13) and not regex.match("b" * 13) and regex.search("xa" + "b" * 12 + "x")
+        assert regex._matcher.max_states == 100
+        regex = TestLazyAFD.nth_from_last(12).compile("derivatives", budget=budget, fallback="nfa")
+        assert regex._engine == "nfa" and regex.match("a" * 13)
+        # Sin el AFND no hay a qué motor pasar
+        with pytest.raises(BudgetExceeded):
+            TestLazyAFD.nth_from_last(12).compile(budget=Budget(nfa_states=10), fallback="nfa")
+        # El mismo presupuesto sirve para varias expresiones: el tiempo se cuenta de nuevo en cada una
+        budget = Budget(dfa_states=100, seconds=60)
+        assert all(TestLazyAFD.nth_from_last(n).compile(budget=budget).match("a" * (n + 1)) for n in range(4))
+
+
+class TestBitParallelAFND:
+
+    def test_shift_loops_and_exceptions(self):
+        '''Las transiciones se separan en corrimientos, bucles y grupos de excepciones'''
+        lower = CharClass([('a', 'z')])
+        regex = Concat(Star(lower), Concat(Char('w'), Concat(Char('h'), Star(lower))))
+        matcher = BitParallelAFND(regex.to_position_automaton(regex.alphabet_classes()))
+        assert matcher.size() == 5 and len(matcher._exceptions) == 0
+        assert matcher._loops == 0b10010 and matcher._first == 0b110
+        for word in ["", "wh", "abwhz", "whwh", "w", "awhb1", "ñwh"]:
+            assert matcher.match_string(word) == regex.match(word)
+        regex = Star(Union(Char('a'), Concat(Char('b'), Char('c'))))
+        matcher = BitParallelAFND(regex.to_position_automaton())
+        assert len(matcher._exceptions) == 1
+        for word in ["", "a", "bc", "abca", "bcbc", "b", "cb", "abcb"]:
+            assert matcher.match_string(word) == regex.match(word)
+
+    def test_requires_position_automaton(self):
+        '''Sólo se puede construir sobre un autómata de posiciones'''
+        regex = Concat(Char('a'), Star(Char('b')))
+        with pytest.raises(ValueError):
+            BitParallelAFND(regex.to_afnd())
+        with pytest.raises(ValueError):
+            BitParallelAFND(afnd_from(0, {1}, [(0, 1, 'a'), (0, 1, 'b'), (1, 1, 'a')]))
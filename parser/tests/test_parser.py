@@ -279,3 +279,13 @@ class TestParser:
         else:
             with pytest.raises(SyntaxError):
                 parse_regex(case["text"])
+
+
+def test_escapes_are_not_shared():
+    '''Cada \\d y \\w es una expresión nueva: compilar una no cambia las demás'''
+    parse_regex(r"\d").compile(engine="nfa", prefilter=False)
+    parse_regex(r"\w").compile(engine="lazy")
+    for text in [r"\d", r"\w"]:
+        regex = parse_regex(text)
+        assert regex._engine == "dfa" and regex._prefilter is None and not regex.is_compiled()
+    assert parse_regex(r"\d\d").exp1 is not parse_regex(r"\d\d").exp2
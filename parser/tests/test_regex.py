@@ -4,6 +4,15 @@ import importlib
 import pytest
 import re
 
+from automata import PackedAFD
+from automata.afnd import SpecialSymbol
+from parse_regex import parse_regex
+from regex import Char, CharClass, Concat, Empty, Lambda, Plus, Star, Union
+from regex.derivatives import Derivatives
+from regex.prefilter import Prefilter
+from regex.regexset import RegexSet
+from regex.utf8 import utf8_sequences
+
 # Setup: Genera los casos de test a partir de los archivos en tests/regexes/*.py
 case_names = [
     basename(filename)[:-3]
@@ -38,6 +47,79 @@ class TestRegex:
                 should_match = case["should_match"](string)
             assert does_match == should_match, f"La regex '{case['regex']}' {'no acepta' if should_match else 'acepta'} la cadena '{string}'"
 
+    @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_position_automaton(self, case, strings):
+        '''El autómata de posiciones acepta las cadenas correctas y minimiza al mismo AFD'''
+        regex = case["regex"]
+        afnd = regex.to_position_automaton()
+        assert all(SpecialSymbol.Lambda not in t for t in afnd.transitions.values())
+        afd = afnd.determinize().minimize()
+        assert afd.size() == case["min_afnd_size"]
+        for string in strings:
+            if type(case["should_match"]) is str:
+                should_match = re.fullmatch(
+                    case["should_match"], string) is not None
+            else:
+                should_match = case["should_match"](string)
+            assert afd.match_string(string) == should_match, f"La regex '{case['regex']}' {'no acepta' if should_match else 'acepta'} la cadena '{string}'"
+
+    @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_derivatives(self, case, strings):
+        '''El AFD por derivadas acepta las cadenas correctas y minimiza al mismo AFD'''
+        afd = Derivatives().to_afd(case["regex"]).minimize()
+        assert afd.size() == case["min_afnd_size"]
+        for string in strings:
+            if type(case["should_match"]) is str:
+                should_match = re.fullmatch(
+                    case["should_match"], string) is not None
+            else:
+                should_match = case["should_match"](string)
+            assert afd.match_string(string) == should_match, f"La regex '{case['regex']}' {'no acepta' if should_match else 'acepta'} la cadena '{string}'"
+
+    @pytest.mark.parametrize("case", [case for case in cases if type(case["should_match"]) is str],
+                             ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_search(self, case, strings):
+        '''Se encuentran las cadenas que tienen una subcadena correcta'''
+        regex = case["regex"]
+        for string in strings:
+            should_match = re.search(case["should_match"], string) is not None
+            assert regex.search(string) == should_match, f"La regex '{case['regex']}' {'no se encuentra' if should_match else 'se encuentra'} en la cadena '{string}'"
+
+    @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_packed_match(self, case, strings):
+        '''La tabla comprimida acepta las mismas cadenas que la tabla densa'''
+        regex = case["regex"].compile()
+        packed = PackedAFD(regex._AFD)
+        for string in strings:
+            assert packed.match_string(string) == regex.match(string), f"La regex '{case['regex']}' con tabla comprimida no reconoce bien la cadena '{string}'"
+
+    @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_lazy_engine(self, case, strings):
+        '''El AFD perezoso acepta y encuentra las mismas cadenas que el AFD mínimo'''
+        regex = case["regex"]
+        lazy = Concat(regex, Lambda()).compile(engine="lazy", max_states=50)
+        for string in strings:
+            assert lazy.match(string) == regex.match(string), f"La regex '{case['regex']}' con el AFD perezoso no reconoce bien la cadena '{string}'"
+            assert lazy.search(string) == regex.search(string), f"La regex '{case['regex']}' con el AFD perezoso no busca bien en la cadena '{string}'"
+
+    @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
+    @pytest.mark.parametrize("engine", ["nfa", "bitparallel"])
+    def test_engines(self, case, engine, strings):
+        '''Las simulaciones (más lentas, así que sobre parte de las cadenas) aceptan y encuentran las mismas cadenas que el AFD mínimo'''
+        regex = case["regex"]
+        other = Concat(regex, Lambda()).compile(engine=engine, max_states=50)
+        for string in strings[:2000]:
+            assert other.match(string) == regex.match(string), f"La regex '{case['regex']}' con el motor {engine} no reconoce bien la cadena '{string}'"
+            assert other.search(string) == regex.search(string), f"La regex '{case['regex']}' con el motor {engine} no busca bien en la cadena '{string}'"
+
+    @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_utf8_match(self, case, strings):
+        '''La expresión sobre bytes acepta la codificación UTF-8 de las mismas cadenas'''
+        regex = case["regex"]
+        binary = regex.to_utf8()
+        for string in strings:
+            assert binary.match(string.encode("utf-8")) == regex.match(string), f"La regex '{case['regex']}' sobre bytes no reconoce bien la cadena '{string}'"
+
     @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
     def test_min_afd_size(self, case):
         '''El tamaño del AFD mínimo es el esperado'''
@@ -46,3 +128,155 @@ class TestRegex:
         actual_min_afnd_size = regex.to_afnd().determinize().minimize().size()
         assert actual_min_afnd_size == expected_min_afnd_size, f"El AFD mínimo de la regex '{regex}' debería tener {expected_min_afnd_size} estados pero tiene {actual_min_afnd_size}"
 
+
+    def test_lazy_compile(self):
+        '''Sólo se construye el AFD de la raíz y recién al usarla'''
+        inner = Star(Char('a'))
+        regex = Concat(inner, Char('b'))
+        assert not regex.is_compiled() and not inner.is_compiled()
+        assert regex.match("aab")
+        assert regex.is_compiled() and not inner.is_compiled()
+        regex.clear_compiled()
+        assert not regex.is_compiled()
+        assert regex.compile().is_compiled()
+
+    def test_naive_search(self):
+        '''La búsqueda naive prueba todas las subcadenas'''
+        regex = Concat(Char('a'), Plus(Char('b')))
+        assert regex.naive_search("xxabbx") and regex.search("xxabbx")
+        assert not regex.naive_search("xxax") and not regex.search("xxax")
+        assert Star(Char('a')).naive_search("") and Star(Char('a')).search("")
+
+    def test_naive_match_is_polynomial(self):
+        '''La implementación naive memoiza, así las clausuras anidadas no son exponenciales'''
+        word = "a" * 2000
+        for regex in [Star(Star(Char('a'))), Plus(Star(Plus(Char('a')))),
+                      Concat(Star(Union(Char('a'), Concat(Char('a'), Char('a')))), Char('b'))]:
+            assert regex.naive_match(word) == regex.match(word)
+            assert regex.naive_match(word + "b") == regex.match(word + "b")
+        assert not Concat(Star(Star(Char('a'))), Char('b')).naive_search(word[:300])
+
+    def test_finditer(self):
+        '''Se encuentran las ocurrencias que empiezan más a la izquierda y, entre ésas, las más largas'''
+        regex = parse_regex("(a|ab)(c|bcd)(d*)")
+        assert list(regex.finditer("xabcdd abc acd")) == [(1, 6), (7, 10), (11, 14)]
+        assert list(Star(Char('a')).finditer("baab")) == [(0, 0), (1, 3), (3, 3), (4, 4)]
+        assert list(Plus(Char('a')).finditer("baab")) == [(1, 3)]
+        assert list(Char('x').finditer("baab")) == []
+        anything = Star(CharClass().negate())
+        assert list(Concat(Char('b'), anything).finditer("abañ")) == [(1, 4)]
+
+    def test_finditer_spans_match(self, strings):
+        '''Cada ocurrencia de finditer es aceptada por la expresión y no hay otra más larga'''
+        regex = parse_regex("[a-z]*wh(a|e)[a-z]")
+        for string in strings:
+            for start, end in regex.finditer(string):
+                assert regex.match(string[start:end])
+                assert not any(regex.match(string[start:j]) for j in range(end + 1, len(string) + 1))
+
+    def test_regex_set(self, strings):
+        '''Un único AFD reconoce todos los patrones del conjunto a la vez'''
+        regexes = [case["regex"] for case in cases]
+        regex_set = RegexSet(regexes)
+        for string in strings:
+            assert regex_set.matches(string) == [i for i, regex in enumerate(regexes) if regex.match(string)]
+
+    def test_regex_set_search(self):
+        '''El conjunto también busca los patrones en cualquier parte de la cadena'''
+        regex_set = RegexSet([parse_regex("whale"), parse_regex("[0-9]+"), parse_regex("a(b|c)*"), Star(Char('x'))])
+        assert regex_set.matches("abcb") == [2] and regex_set.matches("") == [3]
+        assert regex_set.search("the whale 42") == [0, 1, 2, 3]
+        assert regex_set.search("bbb") == [3]
+        assert len(regex_set) == 4 and regex_set.is_compiled()
+
+    def test_prefilter_literals(self):
+        '''Se extraen el prefijo, el sufijo y la subcadena obligatoria más larga'''
+        prefilter = Prefilter(parse_regex("ab(c|d)*xyz(e|f)g"))
+        assert (prefilter.prefix, prefilter.suffix, prefilter.factor) == ("ab", "g", "xyz")
+        assert prefilter.check("abxyzfg") and not prefilter.check("abxyfg") and not prefilter.check("xabxyzfg")
+        prefilter = Prefilter(parse_regex("(the|there)[a-z]*"))
+        assert prefilter.prefix == "the" and prefilter.required == "the" and prefilter.exact is None
+        assert Prefilter(parse_regex("hola")).exact == "hola"
+        assert Prefilter(Concat(Char('a'), CharClass())).never
+        assert Prefilter(Star(Char('a'))).check_search("")
+
+    def test_prefilter_length_and_chars(self):
+        '''Se calculan las longitudes mínima y máxima y los caracteres obligatorios'''
+        regex = Concat(Char('a'), Union(Lambda(), Union(Char('a'), Concat(Char('a'), Char('a')))))
+        prefilter = Prefilter(regex)
+        assert (prefilter.min_length, prefilter.max_length) == (1, 3)
+        assert not prefilter.check("") and not prefilter.check("aaaa") and prefilter.check("aa")
+        prefilter = Prefilter(parse_regex("[0-9]+(x|-x-)[a-z]*"))
+        assert (prefilter.min_length, prefilter.max_length) == (2, None)
+        assert prefilter.chars == {"x"} and prefilter.factor == ""
+        assert not prefilter.check("12-y-ab") and not prefilter.check_search("12-y-ab")
+        assert Prefilter(Union(Empty(), Plus(Char('b')))).chars == {"b"}
+        assert Prefilter(Star(Concat(Char('a'), Empty()))).max_length == 0
+
+    def test_prefilter_can_be_disabled(self):
+        '''El prefiltro está activado por defecto y se puede desactivar al compilar'''
+        regex = parse_regex("x[0-9]+y")
+        assert regex.prefilter() is not None
+        assert regex.compile(prefilter=False).prefilter() is None
+        assert regex.match("x12y") and not regex.match("x12") and regex.search("ax1yb")
+        assert regex.compile(prefilter=True).prefilter().suffix == "y"
+
+    def test_utf8_sequences(self):
+        '''Cada código del intervalo se codifica con exactamente una secuencia de rangos de bytes'''
+        for lo, hi in [(0, 0x7F), (0x3B1, 0x3C9), (0x7F0, 0x10010), (0xD7F0, 0xE010), (0x1F600, 0x1F64F)]:
+            sequences = utf8_sequences(lo, hi)
+            for code in range(lo, hi + 1):
+                if 0xD800 <= code <= 0xDFFF:
+                    continue
+                encoded = chr(code).encode("utf-8")
+                assert sum(1 for sequence in sequences if len(sequence) == len(encoded)
+                           and all(a <= b <= z for (a, z), b in zip(sequence, encoded))) == 1
+        assert len(utf8_sequences(0, 0x10FFFF)) == 9
+
+    def test_to_utf8(self):
+        '''La expresión sobre bytes no decodifica: los bytes inválidos no son ningún carácter'''
+        regex = Concat(Plus(CharClass([('a', 'z')]).negate()), Char('€')).to_utf8()
+        assert regex.match("ÑANDÚ€".encode("utf-8")) and regex.match("€€".encode("utf-8"))
+        assert not regex.match(b"abc\xe2\x82\xac") and not regex.match(b"\xff\xe2\x82\xac")
+        assert regex.prefilter().suffix == "€".encode("utf-8")
+        binary = Concat(Char('ñ'), Char('a')).to_utf8()
+        assert binary.search(b"\xffxx\xc3\xb1a") and not binary.search(b"\xc3a")
+        assert list(binary.finditer("ñaxña".encode("utf-8"))) == [(0, 3), (4, 7)]
+        assert RegexSet([binary, Char('x').to_utf8()]).search("ña x".encode("utf-8")) == [0, 1]
+
+    def test_afnd_size_is_linear(self):
+        '''El AFND de Thompson tiene dos estados por nodo, sin importar el anidamiento'''
+        regex = Char('a')
+        for _ in range(200):
+            regex = Star(Union(regex, Char('b')))
+        afnd = regex.to_afnd()
+        assert afnd.size() == 2 * (1 + 200 * 3)
+        assert regex.match("abba") and not regex.match("abc")
+
+    def test_negated_class_afnd(self):
+        '''Sin clases del alfabeto indicadas, los AFNDs usan las de la expresión: una transición por clase, no por carácter'''
+        regex = Plus(CharClass.of("a").negate())
+        for afnd in [regex.to_afnd(), regex.to_position_automaton()]:
+            assert len(afnd.alphabet) == 1 and afnd.classes is not None
+            afd = afnd.determinize()
+            assert afd.match_string("xñ") and not afd.match_string("xa") and not afd.match_string("")
+
+    def test_char_class(self):
+        '''Las clases de caracteres se unen, intersecan y niegan como conjuntos de intervalos'''
+        lower = CharClass([('a', 'z')])
+        vowels = CharClass.of("aeiou")
+        digits = CharClass([('0', '9')])
+        assert (lower.union(digits)).intervals == [(ord('0'), ord('9')), (ord('a'), ord('z'))]
+        assert lower.intersection(vowels).intervals == vowels.intervals
+        assert len(lower.negate()) == CharClass.MAX_CODE + 1 - 26
+        assert 'q' in lower and 'q' not in vowels and 'Q' in lower.negate()
+        not_lower = Plus(lower.negate())
+        assert not_lower.match("ABC 123 ñ") and not not_lower.match("ABc")
+        assert Concat(vowels, digits).naive_match("e7")
+
+    def test_parser_builds_char_classes(self):
+        '''Los corchetes, \\d y \\w se parsean como un único nodo CharClass'''
+        regex = parse_regex("[a-zA-Z0-9_]")
+        assert isinstance(regex, CharClass) and len(regex) == 63
+        assert isinstance(parse_regex("\\w"), CharClass)
+        assert parse_regex("[-a-c]").intervals == [(ord('-'), ord('-')), (ord('a'), ord('c'))]
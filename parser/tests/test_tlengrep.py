@@ -0,0 +1,41 @@
+import subprocess
+import sys
+from os.path import dirname, join
+
+import pytest
+
+PARSER_DIR = join(dirname(__file__), "..")
+
+
+def tlengrep(*args: str, input: bytes) -> subprocess.CompletedProcess:
+    """Corre tlengrep con los argumentos dados, leyendo la entrada de stdin."""
+    return subprocess.run([sys.executable, "tlengrep.py", *args], input=input, cwd=PARSER_DIR, capture_output=True)
+
+
+class TestTlengrep:
+
+    @pytest.mark.parametrize("options", [["-o"], ["-s"], ["-o", "--timeout", "60"], ["-s", "--timeout", "60"]])
+    def test_bytes(self, options):
+        '''Con --bytes las líneas (y las ocurrencias) se leen y se escriben como bytes'''
+        result = tlengrep("--bytes", *options, "a*n", input="xaanx\nñandú\nxyz\n".encode("utf-8"))
+        assert result.returncode == 0, result.stderr
+        expected = b"aan\nan\n" if "-o" in options else "xaanx\nñandú\n".encode("utf-8")
+        assert result.stdout.endswith(expected)
+
+    def test_budget(self):
+        '''Si no se puede construir el AFD se termina con un error, o se cambia de motor con --fallback'''
+        regex = "(a|b)*a" + "(a|b)" * 14
+        result = tlengrep("--max-memory", "100000", regex, input=b"a" * 15 + b"\n")
+        assert result.returncode == 1 and b"100000 bytes" in result.stderr
+        result = tlengrep("--max-memory", "100000", "--fallback", "nfa", regex, input=b"a" * 15 + b"\nb\n")
+        assert result.returncode == 0 and result.stdout.endswith(b"a" * 15 + b"\n")
+        result = tlengrep("--max-nfa-states", "100", "--fallback", "nfa", regex, input=b"")
+        assert result.returncode == 1 and b"--fallback" in result.stderr
+
+    def test_naive_does_not_compile(self):
+        '''Con -n no se construye ningún autómata, así que no se pasa de los límites'''
+        regex = "(a|b)*a" + "(a|b)" * 15
+        result = tlengrep("-n", "--max-memory", "1000", regex, input=b"a" * 16 + b"\nb\n")
+        assert result.returncode == 0 and result.stdout.endswith(b"a" * 16 + b"\n")
+        result = tlengrep("-n", "--timeout", "-1", regex, input=b"")
+        assert result.returncode == 1 and b"seconds" in result.stderr
@@ -3,41 +3,185 @@ import optparse
 import sys
 import importlib
 
+from automata import Budget, BudgetExceeded
 from parse_regex import parse_regex, SyntaxError
+from regex.regexset import RegexSet
 
-usage = "%prog [regex] [file]"
+usage = "%prog [regex] [file]\n       %prog -e regex [-e regex ...] [-f patternfile] [file]"
 
 opt_parser = optparse.OptionParser(usage=usage)
 opt_parser.add_option("-m", "--module", dest="module", action="store_true",
                       help="read the regular expression from a Python module")
 opt_parser.add_option("-n", "--naive", dest="naive", action="store_true",
                       help="use the naive implementation to match against the regular expression")
+opt_parser.add_option("-s", "--search", dest="search", action="store_true",
+                      help="print the lines that contain a match, instead of the lines that match entirely")
+opt_parser.add_option("-o", "--only-matching", dest="only_matching", action="store_true",
+                      help="print only the (non-empty) matched parts of the lines, one per line")
+opt_parser.add_option("-e", "--regexp", dest="patterns", action="append", default=[], metavar="REGEX",
+                      help="match against REGEX (can be given several times; lines matching any of them are printed)")
+opt_parser.add_option("-f", "--file", dest="pattern_file", metavar="PATTERNFILE",
+                      help="read the regular expressions from PATTERNFILE, one per line")
+opt_parser.add_option("--bytes", dest="bytes", action="store_true",
+                      help="read the input as bytes and match its UTF-8 encoding, without decoding it")
+opt_parser.add_option("--engine", dest="engine", choices=["dfa", "lazy", "nfa", "bitparallel"], default="dfa",
+                      help="build the whole minimal DFA before matching (dfa, the default), "
+                           "only the DFA states the input reaches (lazy), simulate the NFA (nfa), "
+                           "or simulate the position automaton with bit operations (bitparallel)")
+opt_parser.add_option("--max-states", dest="max_states", type="int", metavar="N",
+                      help="keep at most N DFA states with --engine=lazy, and fall back to --engine=nfa "
+                           "if the DFA has more than N states with --engine=dfa (default 100000)")
+opt_parser.add_option("--max-nfa-states", dest="max_nfa_states", type="int", metavar="N",
+                      help="give up if the NFA of the regular expression has more than N states")
+opt_parser.add_option("--timeout", dest="timeout", type="float", metavar="SECONDS",
+                      help="give up if building an automaton takes more than SECONDS seconds")
+opt_parser.add_option("--max-memory", dest="max_memory", type="int", metavar="BYTES",
+                      help="give up if an automaton takes (approximately) more than BYTES bytes")
+opt_parser.add_option("--fallback", dest="fallback", choices=["lazy", "nfa"],
+                      help="use --engine=lazy or --engine=nfa instead of giving up if the DFA exceeds "
+                           "--timeout or --max-memory")
+opt_parser.add_option("--no-prefilter", dest="no_prefilter", action="store_true",
+                      help="don't discard lines by the literals the regular expression requires before matching")
+opt_parser.add_option("--stats", dest="stats", action="store_true",
+                      help="print to stderr how many lines were read, printed and discarded by the prefilter, "
+                           "and how many characters were skipped by accelerated states (or the lazy DFA cache usage)")
 opts, args = opt_parser.parse_args()
 
-if len(args) < 1:
+patterns = list(opts.patterns)
+if opts.pattern_file:
+    with open(opts.pattern_file) as pattern_file:
+        patterns.extend(line.strip("\n") for line in pattern_file if line.strip("\n") != "")
+multiple = len(opts.patterns) > 0 or opts.pattern_file is not None
+budgeted = any(limit is not None for limit in (opts.max_nfa_states, opts.timeout, opts.max_memory))
+
+if not multiple and len(args) < 1:
     opt_parser.print_help()
     exit(1)
-elif len(args) > 2:
+elif len(args) > (1 if multiple else 2):
     print("ERROR: Too many arguments", file=sys.stderr)
     exit(1)
+elif opts.only_matching and opts.naive:
+    print("ERROR: --only-matching can't be used with --naive", file=sys.stderr)
+    exit(1)
+elif opts.bytes and opts.naive:
+    print("ERROR: --bytes can't be used with --naive", file=sys.stderr)
+    exit(1)
+elif multiple and (opts.only_matching or opts.module or opts.engine != "dfa" or budgeted):
+    print("ERROR: --regexp and --file can't be used with --only-matching, --module, --engine or limits",
+          file=sys.stderr)
+    exit(1)
+elif opts.fallback and opts.timeout is None and opts.max_memory is None:
+    # Si el AFND pasa de --max-nfa-states, los otros motores tampoco se pueden construir
+    print("ERROR: --fallback needs --timeout or --max-memory", file=sys.stderr)
+    exit(1)
 else:
-    regex_arg = args[0]
-    if opts.module:
-        regex_module = importlib.import_module(regex_arg)
-        regex = regex_module.__regex__
-    else:
+    if multiple:
+        input_arg = args[0] if len(args) == 1 else None
         try:
-            regex = parse_regex(regex_arg)
+            regexes = [parse_regex(pattern) for pattern in patterns]
         except SyntaxError as e:
             print(f"Syntax error: {e}", file=sys.stderr)
             exit(1)
+        if opts.bytes:
+            regexes = [regex.to_utf8() for regex in regexes]
+        regex_set = RegexSet(regexes)
+        prefilter = None
+    else:
+        regex_arg = args[0]
+        input_arg = args[1] if len(args) == 2 else None
+        if opts.module:
+            regex_module = importlib.import_module(regex_arg)
+            regex = regex_module.__regex__
+        else:
+            try:
+                regex = parse_regex(regex_arg)
+            except SyntaxError as e:
+                print(f"Syntax error: {e}", file=sys.stderr)
+                exit(1)
+        if opts.bytes:
+            regex = regex.to_utf8()
+        try:
+            budget = Budget(opts.max_nfa_states, seconds=opts.timeout, memory=opts.max_memory) if budgeted else None
+        except ValueError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            exit(1)
+        # La implementación naive no usa autómatas: no se construyen
+        if not opts.naive:
+            try:
+                regex.compile(engine=opts.engine, max_states=opts.max_states, budget=budget, fallback=opts.fallback,
+                              prefilter=False if opts.no_prefilter else None)
+                # Los autómatas de -s y -o se construyen ahora, así no se pasa del presupuesto a mitad de la entrada
+                empty = b"" if opts.bytes else ""
+                if opts.search:
+                    regex.search(empty)
+                elif opts.only_matching:
+                    next(regex.finditer(empty), None)
+            except BudgetExceeded as e:
+                print(f"ERROR: {e}", file=sys.stderr)
+                exit(1)
+        prefilter = regex.prefilter() if not opts.no_prefilter else None
+
+    # En modo bytes las líneas no se decodifican, y se escriben tal cual
+    if opts.bytes:
+        sys.stdout.flush()
+        newline, output = b"\n", sys.stdout.buffer
+        input_file = open(input_arg, "rb") if input_arg is not None else sys.stdin.buffer
+    else:
+        newline, output = "\n", sys.stdout
+        input_file = open(input_arg) if input_arg is not None else sys.stdin
 
-    with open(args[1]) if len(args) == 2 else sys.stdin as input_file:
+    lines, printed, discarded = 0, 0, 0
+    with input_file:
         for line in input_file:
-            if opts.naive:
-                matched = regex.naive_match(line.strip("\n"))
+            lines += 1
+            if opts.stats and not multiple and prefilter is not None:
+                if opts.search or opts.only_matching:
+                    discarded += not prefilter.check_search(line.strip(newline))
+                else:
+                    discarded += not prefilter.check(line.strip(newline))
+
+            if opts.only_matching:
+                for start, end in regex.finditer(line.strip(newline)):
+                    if end > start:
+                        output.write(line[start:end] + newline)
+                        printed += 1
+                continue
+
+            if multiple and opts.naive and opts.search:
+                matched = any(regex.naive_search(line.strip(newline)) for regex in regexes)
+            elif multiple and opts.naive:
+                matched = any(regex.naive_match(line.strip(newline)) for regex in regexes)
+            elif multiple and opts.search:
+                matched = len(regex_set.search(line.strip(newline))) > 0
+            elif multiple:
+                matched = len(regex_set.matches(line.strip(newline))) > 0
+            elif opts.naive and opts.search:
+                matched = regex.naive_search(line.strip(newline))
+            elif opts.naive:
+                matched = regex.naive_match(line.strip(newline))
+            elif opts.search:
+                matched = regex.search(line.strip(newline))
             else:
-                matched = regex.match(line.strip("\n"))
+                matched = regex.match(line.strip(newline))
 
             if matched:
-                print(line, end="")
+                output.write(line)
+                printed += 1
+
+    if opts.stats:
+        print(f"lines: {lines}, printed: {printed}", file=sys.stderr)
+        if not multiple and prefilter is not None:
+            print(f"prefilter: {prefilter}, discarded {discarded} lines "
+                  f"({100 * discarded / max(lines, 1):.1f}%)", file=sys.stderr)
+        if not multiple and not opts.naive and not opts.only_matching:
+            compiled = regex._search if opts.search else regex
+            matcher = compiled._matcher if compiled is not None else None
+            engine = compiled._engine if compiled is not None else opts.engine
+            if engine == "lazy" and matcher is not None:
+                print(f"lazy DFA: {matcher.size()} states, {matcher.flushes} flushes", file=sys.stderr)
+            elif engine == "nfa" and matcher is not None:
+                print(f"NFA simulation (engine {opts.engine}): {matcher.size()} NFA states", file=sys.stderr)
+            elif engine == "bitparallel" and matcher is not None:
+                print(f"bit-parallel simulation: {matcher.size()} positions", file=sys.stderr)
+            else:
+                print(f"accelerated states: skipped {getattr(matcher, 'skipped', 0)} characters", file=sys.stderr)